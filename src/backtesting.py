@@ -0,0 +1,221 @@
+"""
+Backtesting Utilities
+
+Vectorized exit resolution for the position-holding and swing backtests.
+Instead of walking every open position bar by bar, all candidate entries are
+laid out as rows of a (entries x holding bars) window matrix. Running maxima
+and first-crossing searches then tell which exit rule fires first, and on
+which bar, for every entry at once.
+
+Exit rules (checked from the bar after entry, same-bar ties resolved in
+this order):
+- STOP_LOSS:        close <= fixed stop level (exit at the stop)
+- TRAILING_STOP:    close <= peak close * (1 - trailing_pct) (exit at the stop)
+- TARGET:           close >= target level (exit at the target)
+- TREND_BREAKDOWN:  close below moving average AND RSI < rsi_floor
+- MARKET_REGIME:    regime flag turns False
+- TIME_EXIT:        maximum holding period reached
+"""
+
+import pandas as pd
+import numpy as np
+
+
+EXIT_RULES = ('STOP_LOSS', 'TRAILING_STOP', 'TARGET',
+              'TREND_BREAKDOWN', 'MARKET_REGIME', 'TIME_EXIT')
+
+
+def _window_length(entries, n_bars, dates, max_hold_bars, max_hold_days):
+    """Number of bars (including the entry bar) each window needs to span"""
+    remaining = int(n_bars - entries.min())
+    if max_hold_bars is not None:
+        return min(int(max_hold_bars) + 1, remaining)
+    if max_hold_days is not None and dates is not None:
+        deadline = dates[entries] + pd.Timedelta(days=max_hold_days)
+        last_bar = np.searchsorted(dates, deadline, side='left')
+        return min(int((last_bar - entries).max()) + 1, remaining)
+    return remaining
+
+
+def resolve_exits(close, entries, stop=None, target=None, trailing_pct=None,
+                  ma=None, rsi=None, rsi_floor=40, regime_ok=None,
+                  max_hold_bars=None, max_hold_days=None, dates=None,
+                  chunk_size=4096):
+    """
+    Resolve the first exit for every entry in one vectorized pass
+
+    Args:
+        close: Series or array of closing prices
+        entries: Integer bar positions where positions are opened (at the close)
+        stop: Fixed stop level, scalar or one value per entry
+        target: Profit target level, scalar or one value per entry
+        trailing_pct: Trailing stop distance from the peak close (0.15 = 15%)
+        ma: Moving average aligned with close (trend breakdown rule)
+        rsi: RSI aligned with close (trend breakdown rule)
+        rsi_floor: RSI level below which a close under `ma` is a breakdown
+        regime_ok: Boolean array aligned with close, False = exit (regime shift)
+        max_hold_bars: Exit after this many bars in the trade
+        max_hold_days: Exit once this many calendar days have elapsed
+        dates: DatetimeIndex aligned with close (defaults to close.index)
+        chunk_size: Entries processed per window matrix, bounds peak memory
+
+    Returns:
+        DataFrame with one row per entry:
+            - entry_idx / exit_idx: bar positions
+            - entry_price / exit_price / highest_price: float
+            - exit_reason: one of EXIT_RULES, or 'OPEN' if no rule fired
+            - bars_held: int
+            - pnl_pct / max_gain_pct: float (percent)
+    """
+    if dates is None and isinstance(close, pd.Series) and isinstance(close.index, pd.DatetimeIndex):
+        dates = close.index
+    if max_hold_days is not None and dates is None:
+        raise ValueError("max_hold_days requires a DatetimeIndex (pass dates=)")
+
+    close = np.asarray(close, dtype=float)
+    entries = np.asarray(entries, dtype=np.int64)
+    n_bars = len(close)
+
+    columns = ['entry_idx', 'exit_idx', 'entry_price', 'exit_price', 'highest_price',
+               'exit_reason', 'bars_held', 'pnl_pct', 'max_gain_pct']
+    if len(entries) == 0:
+        return pd.DataFrame(columns=columns)
+    if entries.min() < 0 or entries.max() >= n_bars:
+        raise ValueError("entries must be bar positions within close")
+
+    ma = None if ma is None else np.asarray(ma, dtype=float)
+    rsi = None if rsi is None else np.asarray(rsi, dtype=float)
+    regime_ok = None if regime_ok is None else np.asarray(regime_ok, dtype=bool)
+    if stop is not None:
+        stop = np.broadcast_to(np.asarray(stop, dtype=float), entries.shape)
+    if target is not None:
+        target = np.broadcast_to(np.asarray(target, dtype=float), entries.shape)
+    day_number = None
+    if dates is not None:
+        dates = pd.DatetimeIndex(dates)
+        if max_hold_days is not None:
+            day_number = (dates - dates[0]).days.to_numpy()
+
+    results = []
+    for start in range(0, len(entries), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        window = _window_length(entries[chunk], n_bars, dates, max_hold_bars, max_hold_days)
+        results.append(_resolve_chunk(
+            close, entries[chunk],
+            None if stop is None else stop[chunk],
+            None if target is None else target[chunk],
+            trailing_pct, ma, rsi, rsi_floor, regime_ok,
+            max_hold_bars, max_hold_days, day_number, window,
+        ))
+
+    result = pd.concat(results, ignore_index=True)
+    return result[columns]
+
+
+def _resolve_chunk(close, entries, stop, target, trailing_pct, ma, rsi, rsi_floor,
+                   regime_ok, max_hold_bars, max_hold_days, day_number, window):
+    """Resolve exits for one chunk of entries (see resolve_exits)"""
+    n_bars = len(close)
+    n_entries = len(entries)
+
+    # Window matrix: column 0 is the entry bar, columns 1.. are holding bars
+    idx = entries[:, None] + np.arange(window)
+    in_data = idx < n_bars
+    idx = np.minimum(idx, n_bars - 1)
+
+    prices = close[idx]
+    peak = np.maximum.accumulate(np.where(in_data, prices, -np.inf), axis=1)
+
+    # Only bars after the entry can trigger an exit
+    held = prices[:, 1:]
+    valid = in_data[:, 1:]
+    hold_idx = idx[:, 1:]
+    entry_price = close[entries]
+
+    hits = []
+    levels = []
+    if stop is not None:
+        stop_level = stop[:, None]
+        hits.append(held <= stop_level)
+        levels.append(np.broadcast_to(stop_level, held.shape))
+    else:
+        hits.append(None)
+        levels.append(None)
+
+    if trailing_pct is not None:
+        trail_level = peak[:, 1:] * (1 - trailing_pct)
+        hits.append(held <= trail_level)
+        levels.append(trail_level)
+    else:
+        hits.append(None)
+        levels.append(None)
+
+    if target is not None:
+        target_level = target[:, None]
+        hits.append(held >= target_level)
+        levels.append(np.broadcast_to(target_level, held.shape))
+    else:
+        hits.append(None)
+        levels.append(None)
+
+    if ma is not None and rsi is not None:
+        hits.append((held < ma[hold_idx]) & (rsi[hold_idx] < rsi_floor))
+    else:
+        hits.append(None)
+    levels.append(held)
+
+    if regime_ok is not None:
+        hits.append(~regime_ok[hold_idx])
+    else:
+        hits.append(None)
+    levels.append(held)
+
+    if max_hold_bars is not None:
+        hits.append(np.broadcast_to(np.arange(1, window) >= max_hold_bars, held.shape))
+    elif max_hold_days is not None:
+        elapsed = day_number[hold_idx] - day_number[entries][:, None]
+        hits.append(elapsed >= max_hold_days)
+    else:
+        hits.append(None)
+    levels.append(held)
+
+    # First crossing per rule; `window` marks "never fired"
+    first = np.full((len(EXIT_RULES), n_entries), window, dtype=np.int64)
+    for r, hit in enumerate(hits):
+        if hit is None or hit.shape[1] == 0:
+            continue
+        hit = hit & valid
+        fired = hit.any(axis=1)
+        first[r] = np.where(fired, hit.argmax(axis=1) + 1, window)
+
+    # argmin returns the first rule among ties, i.e. the priority order
+    rule = first.argmin(axis=0)
+    offset = first[rule, np.arange(n_entries)]
+    fired = offset < window
+
+    last_offset = in_data.sum(axis=1) - 1
+    offset = np.where(fired, offset, last_offset)
+    exit_idx = entries + offset
+    exit_price = close[exit_idx]
+    for r, level in enumerate(levels):
+        if level is None:
+            continue
+        use = fired & (rule == r)
+        if use.any():
+            rows = np.flatnonzero(use)
+            exit_price[rows] = level[rows, offset[rows] - 1]
+
+    highest = peak[np.arange(n_entries), offset]
+    reason = np.where(fired, np.asarray(EXIT_RULES, dtype=object)[rule], 'OPEN')
+
+    return pd.DataFrame({
+        'entry_idx': entries,
+        'exit_idx': exit_idx,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'highest_price': highest,
+        'exit_reason': reason,
+        'bars_held': offset,
+        'pnl_pct': (exit_price / entry_price - 1) * 100,
+        'max_gain_pct': (highest / entry_price - 1) * 100,
+    })
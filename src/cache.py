@@ -0,0 +1,329 @@
+"""
+Indicator Result Cache
+
+Content-addressed memoization for indicator and feature calculations.
+Results are keyed by a fast hash of the input data (values + index) plus the
+function name and parameters, so the same AAPL bars analysed from several
+notebooks are only computed once. Recomputation happens only when the
+underlying bars or the code that computes them change (see code_version).
+
+Two tiers:
+- Memory: per-process LRU (OrderedDict)
+- Disk:   pickle files shared between processes/notebooks, evicted oldest-first
+          once the directory grows past max_disk_bytes. The directory size is
+          tracked as files are written and only rescanned when over the limit
+          or every scan_interval seconds (to pick up other processes' writes).
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / 'data' / 'cache'
+
+# Bump to invalidate every cached result (e.g. after a change code_version can't see)
+CACHE_VERSION = 1
+
+
+def _update_array(h, values):
+    """Feed an array's dtype, shape and contents into a hash object"""
+    values = np.asarray(values)
+    h.update(f'{values.dtype.str}{values.shape}'.encode())
+    if values.dtype == object:
+        values = pd.util.hash_pandas_object(pd.Series(values.ravel()), index=False).to_numpy()
+    h.update(np.ascontiguousarray(values).view(np.uint8).data)
+
+
+def _update(h, obj):
+    """Feed any supported argument into a hash object"""
+    if isinstance(obj, pd.DataFrame):
+        h.update(b'DataFrame')
+        _update(h, obj.columns)
+        _update(h, obj.index)
+        for _, col in obj.items():
+            _update_array(h, col.to_numpy())
+    elif isinstance(obj, pd.Series):
+        h.update(b'Series' + repr(obj.name).encode())
+        _update(h, obj.index)
+        _update_array(h, obj.to_numpy())
+    elif isinstance(obj, pd.Index):
+        h.update(b'Index' + str(obj.dtype).encode())
+        if isinstance(obj, pd.DatetimeIndex):
+            _update_array(h, obj.asi8)
+        elif isinstance(obj, pd.MultiIndex):
+            _update_array(h, pd.util.hash_pandas_object(obj).to_numpy())
+        else:
+            _update_array(h, obj.to_numpy())
+    elif isinstance(obj, np.ndarray):
+        _update_array(h, obj)
+    elif isinstance(obj, (list, tuple)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            _update(h, item)
+    elif isinstance(obj, dict):
+        for key in sorted(obj):
+            h.update(repr(key).encode())
+            _update(h, obj[key])
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*objs):
+    """Return a hex digest identifying the given data and parameters"""
+    h = hashlib.blake2b(digest_size=20)
+    for obj in objs:
+        _update(h, obj)
+    return h.hexdigest()
+
+
+def _source(obj):
+    """Source text of a module/class/function, bytecode if unavailable"""
+    try:
+        return inspect.getsource(obj).encode()
+    except (OSError, TypeError):
+        code = getattr(obj, '__code__', None)
+        return code.co_code if code is not None else repr(obj).encode()
+
+
+@functools.lru_cache(maxsize=None)
+def _module_source(module_name):
+    module = sys.modules.get(module_name)
+    return _source(module) if module is not None else b''
+
+
+def code_version(*objs):
+    """
+    Short hash of the code behind cached results
+
+    Covers the source of each object (a module name hashes that whole
+    module), CACHE_VERSION and the pandas/numpy versions, so editing an
+    indicator invalidates its disk entries instead of serving stale pickles.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f'{CACHE_VERSION}:{pd.__version__}:{np.__version__}'.encode())
+    for obj in objs:
+        h.update(_module_source(obj) if isinstance(obj, str) else _source(obj))
+    return h.hexdigest()
+
+
+def _copy(value):
+    """Hand out copies so callers can't mutate cached results"""
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+class IndicatorCache:
+    """Two-tier (memory LRU + disk) result cache"""
+
+    def __init__(self, maxsize=512, cache_dir=DEFAULT_CACHE_DIR, max_disk_bytes=512 * 1024**2,
+                 scan_interval=60):
+        """
+        Args:
+            maxsize: Max number of results held in memory
+            cache_dir: Directory for the shared disk tier (None = memory only)
+            max_disk_bytes: Disk tier size limit, oldest files evicted first
+            scan_interval: Seconds between full rescans of the disk tier size
+        """
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.scan_interval = scan_interval
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # Unknown until the first scan
+        self._scanned_at = 0.0
+
+    def _path(self, key):
+        return self.cache_dir / f'{key}.pkl'
+
+    def get(self, key):
+        """Return (found, value) for a key, checking memory then disk"""
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return True, self.memory[key]
+
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                os.utime(path)  # Mark as recently used for eviction
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def set(self, key, value):
+        """Store a value in both tiers"""
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            self._write(key, value)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.maxsize:
+                self.memory.popitem(last=False)
+
+    def _write(self, key, value):
+        path = self._path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file then rename, so readers never see partial files
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size - replaced
+            scan = (self._disk_bytes is None
+                    or self._disk_bytes > self.max_disk_bytes
+                    or time.monotonic() - self._scanned_at > self.scan_interval)
+        if scan:
+            self._evict()
+
+    def _evict(self):
+        """Rescan the disk tier and delete least recently used files until it fits"""
+        files = []
+        total = 0
+        for path in self.cache_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_disk_bytes:
+            # Free an extra 10% so a full cache isn't rescanned on every write
+            target = 0.9 * self.max_disk_bytes
+            for _, size, path in sorted(files):
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+
+        with self._lock:
+            self._disk_bytes = total
+            self._scanned_at = time.monotonic()
+
+    def clear(self, disk=False):
+        """Empty the memory tier (and the disk tier if disk=True)"""
+        with self._lock:
+            self.memory.clear()
+        if disk and self.cache_dir is not None:
+            for path in self.cache_dir.glob('*.pkl'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_bytes = None
+
+
+_default_cache = IndicatorCache()
+
+
+def get_default_cache():
+    """Cache used by @memoize when none is given"""
+    return _default_cache
+
+
+def set_default_cache(cache):
+    """Replace the shared cache (None disables memoization)"""
+    global _default_cache
+    _default_cache = cache
+
+
+@contextlib.contextmanager
+def no_cache():
+    """Temporarily disable the shared cache (e.g. for one-off chunk computations)"""
+    global _default_cache
+    previous = _default_cache
+    _default_cache = None
+    try:
+        yield
+    finally:
+        _default_cache = previous
+
+
+def memoize(func=None, cache=None):
+    """
+    Memoize a function on the content of its arguments
+
+    Usage:
+        @memoize
+        def sma(data, window): ...
+
+    The key combines the function's qualified name, the code_version() of
+    its module (helpers it calls included) and a fingerprint of its bound
+    arguments (defaults applied, so sma(x, 20) and sma(x, window=20) share
+    an entry).
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache)
+
+    name = f'{func.__module__}.{func.__qualname__}'
+    signature = inspect.signature(func)
+    version = None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache if cache is not None else _default_cache
+        if store is None:
+            return func(*args, **kwargs)
+
+        nonlocal version
+        if version is None:
+            # Resolved on first call, once the defining module has fully loaded
+            version = code_version(func.__module__, func)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = fingerprint(name, version, bound.arguments)
+        found, value = store.get(key)
+        if not found:
+            value = func(*args, **kwargs)
+            store.set(key, value)
+        return _copy(value)
+
+    return wrapper
@@ -3,20 +3,173 @@ Feature Engineering for Stock Market Prediction
 Uses the custom TechnicalIndicators library
 """
 
+import re
+
 import pandas as pd
 import numpy as np
 from indicators import TechnicalIndicators
+from cache import code_version, fingerprint, get_default_cache, no_cache
+
+
+# Raw data and label columns that are never used as model inputs
+NON_FEATURE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 
+                       'Target', 'Future_Returns', 'Ticker', 'Dividends', 
+                       'Stock Splits']
+
+# Prefixes of label columns (create_target / create_targets), never features
+LABEL_PREFIXES = ('Target', 'Future_Returns', 'TB_')
+
+
+def feature_columns(columns, exclude=None):
+    """Columns usable as model inputs: drops raw OHLCV and every label column"""
+    if exclude is None:
+        exclude = NON_FEATURE_COLUMNS
+    return [col for col in columns
+            if col not in exclude and not str(col).startswith(LABEL_PREFIXES)]
+
+
+def target_name(horizon, threshold):
+    """Column name of a fixed-threshold label"""
+    return f'Target_{horizon}d_{threshold:g}'
+
+
+def barrier_name(horizon, upper, lower):
+    """Column name of a triple-barrier label"""
+    return f'TB_{horizon}d_{upper:g}_{lower:g}'
+
+
+def label_horizon(target):
+    """Bars ahead a label column looks, from its name (None for plain Target)"""
+    match = re.match(r'(?:Target_|TB_|Future_Returns_)(\d+)', str(target))
+    return int(match.group(1)) if match else None
+
+
+def resolved_column(target, columns):
+    """
+    Future_Returns column telling which rows of a label column are resolved
+
+    Labels of the last `horizon` bars are placeholders until their future
+    bars arrive; those rows have a NaN future return. Returns None when the
+    matching column is missing.
+    """
+    if target == 'Target':
+        return 'Future_Returns' if 'Future_Returns' in columns else None
+    match = re.match(r'(?:Target|TB)_(\d+)d', str(target))
+    if match:
+        name = f'Future_Returns_{match.group(1)}'
+        return name if name in columns else None
+    return None
+
+
+def _forward_window(values, width):
+    """View with row i = values[i+1 : i+1+width], NaN-padded past the end"""
+    padded = np.concatenate([values[1:], np.full(width, np.nan)])
+    return np.lib.stride_tricks.sliding_window_view(padded, width)[:len(values)]
+
+
+def forward_labels(close, horizons=(1,), thresholds=(0.02,), barriers=(),
+                   high=None, low=None):
+    """
+    Labels for many horizons, thresholds and barriers from one forward window
+    
+    A single (bars x max horizon) view of future prices is built once; every
+    horizon reads its column from it, and the triple-barrier labels use
+    running forward max/min over it to skip rows that never touch a barrier
+    before searching for the first hit.
+    
+    Parameters:
+    -----------
+    close : Series
+        Closing prices
+    horizons : iterable of int
+        Bars ahead to label
+    thresholds : iterable of float
+        Return thresholds for -1/0/1 labels (0.02 = 2%)
+    barriers : iterable of (upper, lower)
+        Triple-barrier distances as fractions of the entry close; the label
+        is 1 if the upper barrier is touched first, -1 for the lower one
+        (also on a same-bar tie) and 0 if the horizon runs out first
+    high, low : Series
+        Intrabar extremes for barrier touches (default: close)
+    
+    Returns:
+    --------
+    DataFrame with Future_Returns_{h} (float) and int8 label columns named
+    by target_name() / barrier_name(). Rows whose Future_Returns_{h} is
+    NaN are not resolved yet: Target_ labels there are 0, but TB_ labels
+    can already be +/-1 from a barrier touched within the bars available.
+    Drop them via resolved_column(), as prepare_training_data() does.
+    """
+    c = close.to_numpy(dtype=float)
+    max_h = max(horizons)
+    future = _forward_window(c, max_h)
+    out = {}
+    
+    for h in horizons:
+        returns = future[:, h - 1] / c - 1
+        out[f'Future_Returns_{h}'] = returns
+        for threshold in thresholds:
+            out[target_name(h, threshold)] = ((returns > threshold).astype(np.int8)
+                                              - (returns < -threshold).astype(np.int8))
+    
+    if barriers:
+        highs = future if high is None else _forward_window(high.to_numpy(dtype=float), max_h)
+        lows = future if low is None else _forward_window(low.to_numpy(dtype=float), max_h)
+        # Running forward extremes: column k = max/min over the next k+1 bars
+        running_max = np.fmax.accumulate(highs, axis=1)
+        running_min = np.fmin.accumulate(lows, axis=1)
+        
+        for h in horizons:
+            for upper, lower in barriers:
+                upper_level = c * (1 + upper)
+                lower_level = c * (1 - lower)
+                labels = np.zeros(len(c), dtype=np.int8)
+                
+                # Only rows that touch a barrier within h bars need a search
+                touched = (running_max[:, h - 1] >= upper_level) | (running_min[:, h - 1] <= lower_level)
+                rows = np.flatnonzero(touched)
+                if len(rows):
+                    hit_up = highs[rows, :h] >= upper_level[rows, None]
+                    hit_down = lows[rows, :h] <= lower_level[rows, None]
+                    first_up = np.where(hit_up.any(axis=1), hit_up.argmax(axis=1), h)
+                    first_down = np.where(hit_down.any(axis=1), hit_down.argmax(axis=1), h)
+                    labels[rows] = np.where(first_up < first_down, 1, -1)
+                
+                out[barrier_name(h, upper, lower)] = labels
+    
+    return pd.DataFrame(out, index=close.index)
 
 
 class FeatureEngineer:
     """Create features for ML models"""
     
+    # Bars of trailing history each feature group needs for its newest row.
+    # append() recomputes new rows from this much history only.
+    LOOKBACK = {
+        'technical': 200,   # SMA_200
+        'price': 31,        # Volatility_30 on 1-bar returns
+        'volume': 20,       # Volume_SMA_20
+        'trend': 20,        # Trend_Strength
+    }
+    
+    # Recursive features (full-history EMAs and cumulative sums) that are
+    # carried forward from their last value rather than recomputed
+    RECURSIVE = {'EMA_12': 12, 'EMA_26': 26}
+    
     def __init__(self, df):
         """
         Initialize with a dataframe containing: Open, High, Low, Close, Volume
         """
         self.df = df.copy()
         self.ti = TechnicalIndicators()
+        self.raw_columns = list(df.columns)
+        self.build_params = None
+        self.target_params = None
+        self.label_params = None
+        # Preallocated column buffers behind self.df after append()
+        self._buffers = None
+        self._index_buffer = None
+        self._size = 0
     
     def add_technical_indicators(self):
         """Add all technical indicators"""
@@ -196,14 +349,15 @@ class FeatureEngineer:
         
         print(f"Creating target variable (horizon={horizon}, threshold={threshold*100}%)...")
         
+        self.target_params = {'horizon': horizon, 'threshold': threshold, 'method': method}
+        labels = forward_labels(df['Close'], horizons=(horizon,), thresholds=(threshold,))
+        
         # Future returns
-        df['Future_Returns'] = df['Close'].shift(-horizon) / df['Close'] - 1
+        df['Future_Returns'] = labels[f'Future_Returns_{horizon}']
         
         if method == 'classification':
-            # Three classes: -1 (Sell), 0 (Hold), 1 (Buy)
-            df['Target'] = 0  # Hold
-            df.loc[df['Future_Returns'] > threshold, 'Target'] = 1  # Buy
-            df.loc[df['Future_Returns'] < -threshold, 'Target'] = -1  # Sell
+            # Three classes: -1 (Sell), 0 (Hold), 1 (Buy), stored as int8
+            df['Target'] = labels[target_name(horizon, threshold)]
             
             # Count distribution
             target_counts = df['Target'].value_counts()
@@ -219,14 +373,75 @@ class FeatureEngineer:
         self.df = df
         return self
     
+    def create_targets(self, horizons=(1, 5, 10, 20), thresholds=(0.02,), barriers=()):
+        """
+        Create labels for several horizons, thresholds and barriers at once
+        
+        Adds Future_Returns_{h}, Target_{h}d_{threshold} and (for barriers)
+        TB_{h}d_{upper}_{lower} columns, computed in one forward pass by
+        forward_labels(). Label columns are int8.
+        
+        Parameters:
+        -----------
+        horizons : iterable of int
+            Days ahead to label
+        thresholds : iterable of float
+            Minimum return for buy/sell classification (0.02 = 2%)
+        barriers : iterable of (upper, lower)
+            Triple-barrier take-profit / stop distances ((0.10, 0.05) = +10% / -5%)
+        """
+        df = self.df
+        
+        print(f"Creating targets (horizons={list(horizons)}, thresholds={list(thresholds)}, "
+              f"barriers={list(barriers)})...")
+        
+        self.label_params = {'horizons': tuple(horizons), 'thresholds': tuple(thresholds),
+                             'barriers': tuple(barriers)}
+        labels = forward_labels(df['Close'], horizons, thresholds, barriers,
+                                high=df['High'], low=df['Low'])
+        for col in labels.columns:
+            df[col] = labels[col]
+        
+        print(f"Added {len(labels.columns)} label columns")
+        
+        self.df = df
+        return self
+    
     def build_all_features(self, n_lags=5, target_horizon=1, target_threshold=0.02):
         """
         Build all features in one go
+
+        Results are cached on the input bars, parameters and the source of
+        this module and indicators.py, so rebuilding the same ticker from
+        another notebook is a cache lookup.
         """
         print("\n" + "="*60)
         print("BUILDING ALL FEATURES")
         print("="*60)
         
+        self.build_params = {
+            'n_lags': n_lags,
+            'target_horizon': target_horizon,
+            'target_threshold': target_threshold,
+        }
+        # Set here as well as in create_target(): a cache hit skips that call,
+        # and append() needs it to resolve the new label rows
+        self.target_params = {'horizon': target_horizon, 'threshold': target_threshold,
+                              'method': 'classification'}
+        
+        cache = get_default_cache()
+        key = fingerprint('FeatureEngineer.build_all_features',
+                          code_version(__name__, TechnicalIndicators.__module__),
+                          self.df, n_lags, target_horizon, target_threshold)
+        if cache is not None:
+            found, cached = cache.get(key)
+            if found:
+                self.df = cached.copy()
+                print("\n Loaded features from cache")
+                print(f"Total columns: {len(self.df.columns)}")
+                print(f"Total rows: {len(self.df)}")
+                return self
+        
         self.add_technical_indicators()
         self.add_price_features()
         self.add_volume_features()
@@ -234,12 +449,176 @@ class FeatureEngineer:
         self.add_trend_features()
         self.create_target(target_horizon, target_threshold)
         
+        if cache is not None:
+            cache.set(key, self.df.copy())
+        
         print("\n All features built!")
         print(f"Total columns: {len(self.df.columns)}")
         print(f"Total rows: {len(self.df)}")
         
         return self
     
+    def lookback(self):
+        """Trailing bars needed to compute the newest feature row"""
+        n_lags = self.build_params['n_lags'] if self.build_params else 0
+        return max(max(self.LOOKBACK.values()), n_lags + 1)
+    
+    def append(self, new_bars):
+        """
+        Extend the feature matrix with newly arrived bars
+        
+        Only the new rows are computed, from the trailing lookback() bars,
+        with EMAs, MACD and OBV continued from their last values. The
+        Future_Returns/Target rows the new bars resolve are filled in too.
+        Requires build_all_features() to have been run.
+        
+        self.df is backed by preallocated per-column buffers that grow by
+        doubling, so an append writes only the new rows and the resolved
+        label rows instead of copying the whole history. Earlier references
+        to self.df share those buffers and see the resolved label rows;
+        take a copy() to keep a snapshot.
+        
+        Parameters:
+        -----------
+        new_bars : DataFrame
+            OHLCV rows dated after the last existing row
+        """
+        if self.build_params is None:
+            raise ValueError("Run build_all_features() before append()")
+        
+        new_bars = new_bars[new_bars.index > self.df.index[-1]]
+        if new_bars.empty:
+            return self
+        
+        print(f"Appending {len(new_bars)} new bars...")
+        
+        old = self.df
+        n_old = len(old)
+        window = old[self.raw_columns].iloc[-self.lookback():]
+        tail = FeatureEngineer(pd.concat([window, new_bars[self.raw_columns]]))
+        # Single-use window: keep its indicators out of the shared cache
+        with no_cache():
+            tail.add_technical_indicators()
+            tail.add_price_features()
+            tail.add_volume_features()
+            tail.add_lagged_features(self.build_params['n_lags'])
+            tail.add_trend_features()
+        new_rows = tail.df.iloc[len(window):].copy()
+        
+        self._continue_recursive(old.iloc[-1], new_rows)
+        
+        # Label rows the new bars resolve, relabelled on a small recent frame
+        start = max(n_old - self._label_horizon(), 0)
+        recent = pd.concat([old.iloc[start:], new_rows.reindex(columns=old.columns)])
+        self._resolve_targets(recent, n_old - start)
+        
+        self._write_rows(start, recent)
+        return self
+    
+    def _label_horizon(self):
+        """Bars a label looks ahead (rows still unresolved at the end of df)"""
+        horizons = [0]
+        if self.target_params is not None:
+            horizons.append(self.target_params['horizon'])
+        if self.label_params is not None:
+            horizons.extend(self.label_params['horizons'])
+        return max(horizons)
+    
+    def _buffers_current(self):
+        """True while self.df is still the frame built over the buffers"""
+        if self._buffers is None or len(self.df) != self._size:
+            return False
+        if list(self.df.columns) != list(self._buffers):
+            return False
+        return all(np.shares_memory(self.df[col].to_numpy(), buffer)
+                   for col, buffer in self._buffers.items())
+    
+    def _allocate(self, capacity):
+        """(Re)allocate the buffers from self.df, rows beyond len(df) empty"""
+        n = len(self.df)
+        index = self.df.index
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            index_values = index.tz_convert('UTC').tz_localize(None).to_numpy()
+        else:
+            index_values = index.to_numpy()
+        
+        self._index_buffer = np.empty(capacity, dtype=index_values.dtype)
+        self._index_buffer[:n] = index_values
+        self._buffers = {}
+        for col in self.df.columns:
+            values = self.df[col].to_numpy()
+            self._buffers[col] = np.empty(capacity, dtype=values.dtype)
+            self._buffers[col][:n] = values
+        self._size = n
+    
+    def _write_rows(self, start, rows):
+        """Write rows from position `start` on into the buffers and rewrap self.df"""
+        n = start + len(rows)
+        if not self._buffers_current():
+            self._allocate(max(2 * n, 64))
+        elif n > len(self._index_buffer):
+            self._allocate(2 * n)
+        
+        index = self.df.index
+        new_index = rows.index
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            new_index = new_index.tz_convert('UTC').tz_localize(None)
+        self._index_buffer[start:n] = new_index.to_numpy()
+        for col, buffer in self._buffers.items():
+            buffer[start:n] = rows[col].astype(buffer.dtype).to_numpy()
+        self._size = n
+        
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            wrapped = pd.DatetimeIndex(self._index_buffer[:n]).tz_localize('UTC').tz_convert(index.tz)
+        else:
+            wrapped = pd.Index(self._index_buffer[:n], copy=False)
+        self.df = pd.DataFrame({col: buffer[:n] for col, buffer in self._buffers.items()},
+                               index=wrapped.rename(index.name), copy=False)
+    
+    def _continue_recursive(self, last, new_rows):
+        """Continue full-history features from the last existing row"""
+        close = new_rows['Close']
+        
+        # ewm(adjust=False) seeded with the previous value is the EMA recursion
+        for col, span in self.RECURSIVE.items():
+            seeded = pd.concat([pd.Series([last[col]]), close.reset_index(drop=True)])
+            new_rows[col] = seeded.ewm(span=span, adjust=False).mean().iloc[1:].to_numpy()
+        
+        macd_line = new_rows['EMA_12'] - new_rows['EMA_26']
+        seeded = pd.concat([pd.Series([last['MACD_Signal']]), macd_line.reset_index(drop=True)])
+        new_rows['MACD'] = macd_line
+        new_rows['MACD_Signal'] = seeded.ewm(span=9, adjust=False).mean().iloc[1:].to_numpy()
+        new_rows['MACD_Hist'] = new_rows['MACD'] - new_rows['MACD_Signal']
+        
+        prev_close = pd.concat([pd.Series([last['Close']]), close.reset_index(drop=True)])
+        direction = np.sign(prev_close.diff().iloc[1:].to_numpy())
+        new_rows['OBV'] = last['OBV'] + np.cumsum(direction * new_rows['Volume'].to_numpy())
+    
+    def _resolve_targets(self, df, n_old):
+        """Fill the label rows of df (old rows then new bars) the new bars resolve"""
+        if self.target_params is not None:
+            horizon = self.target_params['horizon']
+            threshold = self.target_params['threshold']
+            start = max(n_old - horizon, 0)
+            rows = df.index[start:]
+            labels = forward_labels(df['Close'].iloc[start:], (horizon,), (threshold,))
+            
+            df.loc[rows, 'Future_Returns'] = labels[f'Future_Returns_{horizon}']
+            if self.target_params['method'] == 'classification':
+                df.loc[rows, 'Target'] = labels[target_name(horizon, threshold)]
+            else:
+                df.loc[rows, 'Target'] = labels[f'Future_Returns_{horizon}']
+        
+        if self.label_params is not None:
+            start = max(n_old - max(self.label_params['horizons']), 0)
+            rows = df.index[start:]
+            tail = df.iloc[start:]
+            labels = forward_labels(tail['Close'], self.label_params['horizons'],
+                                    self.label_params['thresholds'], self.label_params['barriers'],
+                                    high=tail['High'], low=tail['Low'])
+            for col in labels.columns:
+                df.loc[rows, col] = labels[col]
+    
     def get_features(self, drop_na=True):
         """Return processed dataframe"""
         if drop_na:
@@ -253,13 +632,7 @@ class FeatureEngineer:
     
     def get_feature_names(self, exclude=None):
         """Get list of feature column names"""
-        if exclude is None:
-            exclude = ['Open', 'High', 'Low', 'Close', 'Volume', 
-                      'Target', 'Future_Returns', 'Ticker', 'Dividends', 
-                      'Stock Splits']
-        
-        all_cols = self.df.columns.tolist()
-        features = [col for col in all_cols if col not in exclude]
+        features = feature_columns(self.df.columns, exclude)
         
         print(f"\n Feature columns ({len(features)}):")
         for i, feat in enumerate(features, 1):
@@ -273,13 +646,194 @@ class FeatureEngineer:
             print("  No target variable found. Run create_target() first.")
             return None
         
+        from screening import information_coefficient
+        
         feature_cols = self.get_feature_names()
-        correlations = self.df[feature_cols + ['Target']].corr()['Target'].drop('Target')
-        correlations = correlations.abs().sort_values(ascending=False)
+        # One matrix-vector pass instead of the full feature x feature corr()
+        correlations = information_coefficient(self.df[feature_cols], self.df['Target'])
+        correlations = correlations.rename('Target').abs().sort_values(ascending=False)
         
         print(f"\n Top {top_n} features by correlation with target:")
         print("="*60)
         for i, (feat, corr) in enumerate(correlations.head(top_n).items(), 1):
             print(f"{i:2d}. {feat:30s} : {corr:.4f}")
         
-        return correlations.head(top_n)
\ No newline at end of file
+        return correlations.head(top_n)
+
+
+def build_panels(frames, fields=('Open', 'High', 'Low', 'Close', 'Volume')):
+    """
+    Turn per-ticker OHLCV frames into wide panels (dates x tickers)
+    
+    Parameters:
+    -----------
+    frames : dict
+        ticker -> OHLCV DataFrame
+    fields : tuple
+        Columns to pivot
+    
+    Returns:
+    --------
+    dict of field -> DataFrame with one column per ticker
+    """
+    return {
+        field: pd.concat({ticker: df[field] for ticker, df in frames.items()}, axis=1)
+        for field in fields
+    }
+
+
+def align_panels(panels):
+    """
+    Right-align every ticker's own bars in wide panels
+    
+    build_panels() puts tickers on the union of their dates, so a ticker
+    missing a date has a NaN row inside its windows and one whose data
+    stops early has NaN last rows. Here each column keeps only the rows
+    where that ticker has a Close, in date order, ending on the last row
+    (shorter histories are NaN-padded at the top). Windows over the
+    aligned panels then see exactly the bars FeatureEngineer would.
+    
+    Returns:
+    --------
+    dict of field -> DataFrame with a RangeIndex (rows are bar positions,
+    not dates)
+    """
+    valid = panels['Close'].notna().to_numpy()
+    # Stable sort puts each column's gaps first and its own bars last, in order
+    order = np.argsort(valid, axis=0, kind='stable')
+    padding = ~np.take_along_axis(valid, order, axis=0)
+    
+    aligned = {}
+    for field, panel in panels.items():
+        values = np.take_along_axis(panel.to_numpy(dtype=float), order, axis=0)
+        values[padding] = np.nan
+        aligned[field] = pd.DataFrame(values, columns=panel.columns)
+    return aligned
+
+
+def latest_panel_features(panels, n_lags=5):
+    """
+    FeatureEngineer's feature columns for the newest bar of every ticker
+    
+    Works on wide panels (see build_panels), so every feature is computed
+    for all tickers at once, on each ticker's own bars (align_panels), so
+    the row matches FeatureEngineer(df).df.iloc[-1] even when tickers miss
+    dates or stop early. Windowed features only look at the trailing
+    FeatureEngineer lookback; EMAs, MACD and OBV use the full panel since
+    they depend on all history.
+    
+    Returns:
+    --------
+    DataFrame indexed by ticker, columns in FeatureEngineer order
+    """
+    panels = align_panels(panels)
+    lookback = max(max(FeatureEngineer.LOOKBACK.values()), n_lags + 1) + 1
+    close_all = panels['Close']
+    volume_all = panels['Volume']
+    o, h, l, c, v = (panels[field].iloc[-lookback:]
+                     for field in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    last = {}
+    
+    def add(name, values):
+        last[name] = values.iloc[-1] if isinstance(values, pd.DataFrame) else values
+    
+    # Technical indicators
+    for window in (10, 20, 50, 200):
+        add(f'SMA_{window}', c.rolling(window).mean())
+    ema_12 = close_all.ewm(span=12, adjust=False).mean()
+    ema_26 = close_all.ewm(span=26, adjust=False).mean()
+    add('EMA_12', ema_12)
+    add('EMA_26', ema_26)
+    
+    delta = c.diff()
+    for window in (14, 7):
+        gain = delta.where(delta > 0, 0).rolling(window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window).mean()
+        add(f'RSI_{window}', 100 - (100 / (1 + gain / loss)))
+    
+    macd_line = ema_12 - ema_26
+    macd_signal = macd_line.ewm(span=9, adjust=False).mean()
+    add('MACD', macd_line)
+    add('MACD_Signal', macd_signal)
+    add('MACD_Hist', macd_line - macd_signal)
+    
+    bb_middle = c.rolling(20).mean()
+    bb_std = c.rolling(20).std()
+    bb_upper = bb_middle + bb_std * 2
+    bb_lower = bb_middle - bb_std * 2
+    add('BB_Upper', bb_upper)
+    add('BB_Middle', bb_middle)
+    add('BB_Lower', bb_lower)
+    add('BB_Width', (bb_upper - bb_lower) / bb_middle)
+    add('BB_Position', (c - bb_lower) / (bb_upper - bb_lower))
+    
+    prev_close = c.shift()
+    tr = np.fmax(np.fmax(h - l, (h - prev_close).abs()), (l - prev_close).abs())
+    atr_14 = tr.rolling(14).mean()
+    add('ATR_14', atr_14)
+    
+    lowest_low = l.rolling(14).min()
+    highest_high = h.rolling(14).max()
+    stoch_k = 100 * ((c - lowest_low) / (highest_high - lowest_low))
+    add('STOCH_K', stoch_k)
+    add('STOCH_D', stoch_k.rolling(3).mean())
+    
+    add('OBV', (np.sign(close_all.diff()) * volume_all).fillna(0).cumsum())
+    
+    typical = ((h + l + c) / 3).iloc[-20:]
+    mean_deviation = (typical - typical.mean()).abs().mean()
+    add('CCI_20', (typical.iloc[-1] - typical.mean()) / (0.015 * mean_deviation))
+    
+    add('Williams_R', -100 * ((highest_high - c) / (highest_high - lowest_low)))
+    
+    plus_dm = h.diff().clip(lower=0)
+    minus_dm = (-l.diff()).clip(lower=0)
+    plus_di = 100 * (plus_dm.rolling(14).mean() / atr_14)
+    minus_di = 100 * (minus_dm.rolling(14).mean() / atr_14)
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    add('ADX', dx.rolling(14).mean())
+    add('Plus_DI', plus_di)
+    add('Minus_DI', minus_di)
+    
+    # Price features
+    returns = c.pct_change()
+    add('Returns', returns)
+    add('Log_Returns', np.log(c / c.shift(1)))
+    for window in (5, 10, 20, 30):
+        add(f'Volatility_{window}', returns.rolling(window).std())
+    for window in (5, 10, 20):
+        add(f'Momentum_{window}', c - c.shift(window))
+    for window in (5, 10, 20):
+        add(f'ROC_{window}', (c - c.shift(window)) / c.shift(window) * 100)
+    hl_range = h - l
+    add('HL_Range', hl_range)
+    add('HL_Pct', hl_range / c)
+    add('Close_Position', (c - l) / hl_range)
+    add('Gap', o - c.shift(1))
+    add('Gap_Pct', (o - c.shift(1)) / c.shift(1))
+    add('Range_vs_Avg', hl_range / hl_range.rolling(20).mean())
+    
+    # Volume features
+    for window in (5, 10, 20):
+        add(f'Volume_SMA_{window}', v.rolling(window).mean())
+    add('Volume_Ratio_5', v.iloc[-1] / last['Volume_SMA_5'])
+    add('Volume_Ratio_20', v.iloc[-1] / last['Volume_SMA_20'])
+    add('Volume_ROC_5', (v - v.shift(5)) / v.shift(5) * 100)
+    add('PV_Trend', c * v)
+    
+    # Lagged features
+    for i in range(1, n_lags + 1):
+        add(f'Close_lag_{i}', c.shift(i))
+        add(f'Returns_lag_{i}', returns.shift(i))
+        add(f'Volume_lag_{i}', v.shift(i))
+    
+    # Trend features
+    add('SMA_Cross_20_50', (last['SMA_20'] > last['SMA_50']).astype(int))
+    add('SMA_Cross_50_200', (last['SMA_50'] > last['SMA_200']).astype(int))
+    add('Price_vs_SMA20', (c.iloc[-1] - last['SMA_20']) / last['SMA_20'])
+    add('Price_vs_SMA50', (c.iloc[-1] - last['SMA_50']) / last['SMA_50'])
+    first = c.iloc[-20]
+    add('Trend_Strength', ((c.iloc[-1] - first) / first).where(first != 0, 0))
+    
+    return pd.DataFrame(last)
+
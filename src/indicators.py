@@ -1,14 +1,18 @@
 """Technical Indicators Library - Extended"""
 import pandas as pd
 import numpy as np
+from cache import memoize
 
 # Existing functions (keep these)
+@memoize
 def sma(data, window):
     return data.rolling(window=window).mean()
 
+@memoize
 def ema(data, window):
     return data.ewm(span=window, adjust=False).mean()
 
+@memoize
 def rsi(data, window=14):
     delta = data.diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
@@ -16,6 +20,7 @@ def rsi(data, window=14):
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
+@memoize
 def macd(data, fast=12, slow=26, signal=9):
     ema_fast = ema(data, fast)
     ema_slow = ema(data, slow)
@@ -28,6 +33,7 @@ def macd(data, fast=12, slow=26, signal=9):
         'Histogram': histogram
     })
 
+@memoize
 def bollinger_bands(data, window=20, num_std=2):
     middle = sma(data, window)
     std = data.rolling(window=window).std()
@@ -39,6 +45,7 @@ def bollinger_bands(data, window=20, num_std=2):
         'Lower': lower
     })
 
+@memoize
 def adx(high, low, close, window=14):
     """Average Directional Index - Trend Strength"""
     plus_dm = high.diff()
@@ -65,6 +72,7 @@ def adx(high, low, close, window=14):
         'Minus_DI': minus_di
     })
 
+@memoize
 def atr(high, low, close, window=14):
     """Average True Range - Volatility"""
     tr1 = high - low
@@ -73,6 +81,7 @@ def atr(high, low, close, window=14):
     tr = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
     return tr.rolling(window=window).mean()
 
+@memoize
 def stochastic(high, low, close, k_window=14, d_window=3):
     """Stochastic Oscillator"""
     lowest_low = low.rolling(window=k_window).min()
@@ -86,6 +95,7 @@ def stochastic(high, low, close, k_window=14, d_window=3):
         'D': d_percent
     })
 
+@memoize
 def cci(high, low, close, window=20):
     """Commodity Channel Index"""
     typical_price = (high + low + close) / 3
@@ -96,6 +106,7 @@ def cci(high, low, close, window=20):
     cci_value = (typical_price - sma_tp) / (0.015 * mean_deviation)
     return cci_value
 
+@memoize
 def williams_r(high, low, close, window=14):
     """Williams %R"""
     highest_high = high.rolling(window=window).max()
@@ -104,14 +115,17 @@ def williams_r(high, low, close, window=14):
     wr = -100 * ((highest_high - close) / (highest_high - lowest_low))
     return wr
 
+@memoize
 def roc(data, window=10):
     """Rate of Change"""
     return ((data - data.shift(window)) / data.shift(window)) * 100
 
+@memoize
 def obv(close, volume):
     """On Balance Volume"""
     return (np.sign(close.diff()) * volume).fillna(0).cumsum()
 
+@memoize
 def mfi(high, low, close, volume, window=14):
     """Money Flow Index - RSI with Volume"""
     typical_price = (high + low + close) / 3
@@ -128,6 +142,7 @@ def mfi(high, low, close, volume, window=14):
     
     return mfi_value
 
+@memoize
 def cmf(high, low, close, volume, window=20):
     """Chaikin Money Flow"""
     mfv = ((close - low) - (high - close)) / (high - low) * volume
@@ -135,6 +150,7 @@ def cmf(high, low, close, volume, window=20):
     cmf_value = mfv.rolling(window=window).sum() / volume.rolling(window=window).sum()
     return cmf_value
 
+@memoize
 def supertrend(high, low, close, atr_period=10, multiplier=3):
     """SuperTrend Indicator - Fixed Version"""
     atr_values = atr(high, low, close, atr_period)
@@ -174,6 +190,7 @@ def supertrend(high, low, close, atr_period=10, multiplier=3):
         'Direction': direction
     })
 
+@memoize
 def keltner_channels(high, low, close, window=20, atr_period=10, multiplier=2):
     """Keltner Channels"""
     middle = ema(close, window)
@@ -188,6 +205,7 @@ def keltner_channels(high, low, close, window=20, atr_period=10, multiplier=2):
         'Lower': lower
     })
 
+@memoize
 def donchian_channels(high, low, window=20):
     """Donchian Channels"""
     upper = high.rolling(window=window).max()
@@ -200,6 +218,7 @@ def donchian_channels(high, low, window=20):
         'Lower': lower
     })
 
+@memoize
 def ichimoku_cloud(high, low, close):
     """Ichimoku Cloud - multi-timeframe support/resistance"""
     conversion = (high.rolling(9).max() + low.rolling(9).min()) / 2
@@ -214,6 +233,7 @@ def ichimoku_cloud(high, low, close):
         'Span_B': span_b
     })
 
+@memoize
 def squeeze_momentum(high, low, close, bb_length=20, kc_length=20):
     """
     Squeeze Momentum - detects consolidation before breakouts
@@ -238,9 +258,56 @@ def squeeze_momentum(high, low, close, bb_length=20, kc_length=20):
         'Momentum': momentum
     })
 
+@memoize
 def vwap(high, low, close, volume):
     """Volume Weighted Average Price"""
     typical_price = (high + low + close) / 3
     return (typical_price * volume).cumsum() / volume.cumsum()
 
+class TechnicalIndicators:
+    """Object interface over the (memoized) indicator functions, used by FeatureEngineer"""
+
+    sma = staticmethod(sma)
+    ema = staticmethod(ema)
+    rsi = staticmethod(rsi)
+    atr = staticmethod(atr)
+    adx = staticmethod(adx)
+    cci = staticmethod(cci)
+    williams_r = staticmethod(williams_r)
+    roc = staticmethod(roc)
+    obv = staticmethod(obv)
+
+    @staticmethod
+    @memoize
+    def momentum(data, window=10):
+        """Price change over window periods"""
+        return data - data.shift(window)
+
+    @staticmethod
+    def macd(data, fast=12, slow=26, signal=9):
+        result = macd(data, fast, slow, signal)
+        return pd.DataFrame({
+            'MACD': result['MACD'],
+            'MACD_Signal': result['Signal'],
+            'MACD_Hist': result['Histogram']
+        })
+
+    @staticmethod
+    def bollinger_bands(data, window=20, num_std=2):
+        result = bollinger_bands(data, window, num_std)
+        return pd.DataFrame({
+            'BB_Upper': result['Upper'],
+            'BB_Middle': result['Middle'],
+            'BB_Lower': result['Lower'],
+            'BB_Width': (result['Upper'] - result['Lower']) / result['Middle']
+        })
+
+    @staticmethod
+    def stochastic(high, low, close, k_window=14, d_window=3):
+        result = stochastic(high, low, close, k_window, d_window)
+        return pd.DataFrame({
+            'STOCH_K': result['K'],
+            'STOCH_D': result['D']
+        })
+
 print('Extended indicators module loaded')
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Swing Points, Support/Resistance and Entry Levels
+
+Vectorized versions of the level logic in 02.1_price_finder, computed for
+every bar of every ticker at once instead of with tail() calls on the last
+bar of one ticker. All functions accept a Series (one ticker) or a wide
+DataFrame (dates x tickers, see features.build_panels).
+
+- rolling_max / rolling_min: O(n) rolling extremes, independent of window
+- swing_points: pivot highs/lows with confirmation delay (no lookahead)
+- support_resistance_zones: swing prices clustered into zones
+- entry_levels: calculate_entry_levels for every bar, plus the latest
+  confirmed swing high/low
+"""
+
+import pandas as pd
+import numpy as np
+
+
+ENTRY_TYPES = ['Conservative (20-day MA)', 'Moderate (50-day MA)',
+               'Moderate (Fib 50%)', 'Aggressive (Breakout now)']
+
+
+def _matrix(data):
+    """Series/DataFrame -> 2-D float array (bars x tickers)"""
+    values = np.asarray(data, dtype=float)
+    return values.reshape(len(values), -1)
+
+
+def _wrap(values, like, name=None):
+    """2-D array back to the caller's Series/DataFrame shape"""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    return pd.Series(values[:, 0], index=like.index, name=name)
+
+
+def _rolling_extreme(values, window, op, fill):
+    """
+    Rolling max/min in O(n) per column (van Herk / Gil-Werman)
+
+    The series is cut into blocks of `window` bars. Every window spans at
+    most two blocks, so its extreme is op(suffix extreme of the first block,
+    prefix extreme of the second) - two accumulate passes for all windows,
+    the array equivalent of a monotonic deque. NaN handling matches pandas'
+    rolling(window).max(): NaN unless the window holds `window` values.
+    """
+    n, m = values.shape
+    out = np.full((n, m), np.nan)
+    if n < window:
+        return out
+
+    missing = np.isnan(values)
+    n_blocks = -(-n // window)
+    padded = np.full((n_blocks * window, m), fill)
+    padded[:n] = np.where(missing, fill, values)
+    blocks = padded.reshape(n_blocks, window, m)
+
+    prefix = op.accumulate(blocks, axis=1).reshape(-1, m)[:n]
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, m)[:n]
+    out[window - 1:] = op(suffix[:n - window + 1], prefix[window - 1:])
+
+    counts = np.cumsum(~missing, axis=0)
+    counts[window:] -= counts[:-window].copy()
+    out[counts < window] = np.nan
+    return out
+
+
+def rolling_max(data, window):
+    """Same as data.rolling(window).max(), in O(n) regardless of window"""
+    return _wrap(_rolling_extreme(_matrix(data), window, np.maximum, -np.inf), data,
+                 getattr(data, 'name', None))
+
+
+def rolling_min(data, window):
+    """Same as data.rolling(window).min(), in O(n) regardless of window"""
+    return _wrap(_rolling_extreme(_matrix(data), window, np.minimum, np.inf), data,
+                 getattr(data, 'name', None))
+
+
+def _pivots(values, left, right, op, fill, better):
+    """Boolean pivot flags: extreme of the centred window, strictly beyond the left side"""
+    n, m = values.shape
+    centred = np.full((n, m), np.nan)
+    extreme = _rolling_extreme(values, left + right + 1, op, fill)
+    if right:
+        centred[:-right] = extreme[right:]
+    else:
+        centred = extreme
+    before = np.full((n, m), np.nan)
+    before[1:] = _rolling_extreme(values, left, op, fill)[:-1]
+    return (values == centred) & better(values, before)
+
+
+def swing_points(high, low, left=5, right=5):
+    """
+    Swing highs and lows
+
+    A bar is a swing high when its high is the highest of the `left` bars
+    before and `right` bars after it (and strictly above the left side, so
+    flat tops count once). It is only *known* `right` bars later, so the
+    confirmed columns are placed on the confirmation bar and are safe to use
+    in backtests.
+
+    Args:
+        high, low: Series or wide DataFrames (dates x tickers)
+        left, right: Bars on each side of the pivot
+
+    Returns:
+        dict with (Series or wide DataFrame each):
+            - Swing_High / Swing_Low: pivot price on the pivot bar, else NaN
+            - Confirmed_High / Confirmed_Low: same prices shifted to the bar
+              where the pivot is confirmed
+            - Last_Swing_High / Last_Swing_Low: latest confirmed pivot as of
+              each bar
+    """
+    h, l = _matrix(high), _matrix(low)
+    is_high = _pivots(h, left, right, np.maximum, -np.inf, np.greater)
+    is_low = _pivots(l, left, right, np.minimum, np.inf, np.less)
+
+    result = {}
+    for name, values, flags, like in (('High', h, is_high, high), ('Low', l, is_low, low)):
+        pivot = np.where(flags, values, np.nan)
+        confirmed = np.full_like(pivot, np.nan)
+        confirmed[right:] = pivot[:len(pivot) - right]
+        result[f'Swing_{name}'] = _wrap(pivot, like, f'Swing_{name}')
+        result[f'Confirmed_{name}'] = _wrap(confirmed, like, f'Confirmed_{name}')
+        result[f'Last_Swing_{name}'] = _wrap(confirmed, like, f'Last_Swing_{name}').ffill()
+    return result
+
+
+def _anchored_zones(cols, values, tolerance):
+    """Zone id per point (sorted by ticker, price), zones capped at first price * (1 + tolerance)"""
+    zone = np.empty(len(values), dtype=int)
+    bounds = np.r_[0, np.flatnonzero(cols[1:] != cols[:-1]) + 1, len(values)]
+    n_zones = 0
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        segment = values[start:stop]
+        i = 0
+        while i < len(segment):
+            end = np.searchsorted(segment, segment[i] * (1 + tolerance), side='right')
+            zone[start + i:start + end] = n_zones
+            n_zones += 1
+            i = end
+    return zone
+
+
+def support_resistance_zones(high, low, close, left=5, right=5, tolerance=0.02,
+                             min_touches=2, lookback=None):
+    """
+    Cluster swing highs and lows into support/resistance zones
+
+    Swing prices of each ticker are sorted and grouped from the lowest up:
+    a zone takes every price within `tolerance` of its first (lowest) price
+    and the next price starts a new zone, so nearby pivots (highs and lows
+    alike - old resistance becomes support) merge into one zone but a zone
+    never spans more than `tolerance`, however closely pivots are spaced.
+    All tickers are sorted in one pass.
+
+    Args:
+        high, low, close: Series or wide DataFrames (dates x tickers)
+        left, right: Pivot definition, see swing_points()
+        tolerance: Max relative width of a zone (above its lowest price)
+        min_touches: Minimum swing points for a zone to be reported
+        lookback: Only use pivots from the last `lookback` bars
+
+    Returns:
+        DataFrame, one row per zone, sorted by ticker then level:
+            - Ticker (wide input only), Level (mean price), Zone_Low, Zone_High
+            - Touches, Last_Touch (date of the latest pivot)
+            - Type ('Support' below the last close, else 'Resistance')
+            - Distance_Pct from the last close
+    """
+    swings = swing_points(high, low, left, right)
+    start = 0 if lookback is None else max(len(close) - lookback, 0)
+
+    # Swing highs and lows pooled as (bar, ticker, price) points
+    rows, cols, values = [], [], []
+    for name in ('Swing_High', 'Swing_Low'):
+        pivots = _matrix(swings[name])[start:]
+        r, k = np.nonzero(~np.isnan(pivots))
+        rows.append(r + start)
+        cols.append(k)
+        values.append(pivots[r, k])
+    rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+    columns = ['Level', 'Zone_Low', 'Zone_High', 'Touches', 'Last_Touch', 'Type', 'Distance_Pct']
+    wide = isinstance(close, pd.DataFrame)
+    if len(values) == 0:
+        return pd.DataFrame(columns=(['Ticker'] if wide else []) + columns)
+
+    order = np.lexsort((values, cols))
+    rows, cols, values = rows[order], cols[order], values[order]
+    zone = _anchored_zones(cols, values, tolerance)
+
+    points = pd.DataFrame({'zone': zone, 'col': cols, 'price': values,
+                           'date': close.index[rows]})
+    zones = points.groupby('zone').agg(
+        col=('col', 'first'),
+        Level=('price', 'mean'),
+        Zone_Low=('price', 'min'),
+        Zone_High=('price', 'max'),
+        Touches=('price', 'size'),
+        Last_Touch=('date', 'max'),
+    )
+    zones = zones[zones['Touches'] >= min_touches]
+
+    last_close = pd.DataFrame(close).ffill().iloc[-1].to_numpy(dtype=float)[zones['col']]
+    zones['Type'] = np.where(zones['Level'] < last_close, 'Support', 'Resistance')
+    zones['Distance_Pct'] = (zones['Level'] - last_close) / last_close * 100
+
+    if wide:
+        zones.insert(0, 'Ticker', close.columns[zones['col']])
+        return zones.drop(columns='col').reset_index(drop=True)[['Ticker'] + columns]
+    return zones.reset_index(drop=True)[columns]
+
+
+def entry_levels(high, low, close, left=5, right=5):
+    """
+    calculate_entry_levels for every bar of every ticker
+
+    Args:
+        high, low, close: Series or wide DataFrames (dates x tickers)
+        left, right: Pivot definition for the swing columns
+
+    Returns:
+        Series input: DataFrame with one column per level.
+        Wide input: dict of level name -> wide DataFrame.
+        Levels:
+            - SMA_20, SMA_50, Recent_Low (20-bar), High_20, High_60, Low_60
+            - Fib_50, Fib_618 (retracements of the 60-bar range)
+            - Breakout (close within 2% of the 20-bar high)
+            - Best_Entry / Best_Type / Best_Distance_Pct: the level closest
+              to the close among those the notebook offers (MAs and Fib 50%
+              below the close, or the close itself on a breakout)
+            - Last_Swing_High, Last_Swing_Low (confirmed, see swing_points)
+    """
+    h, l, c = _matrix(high), _matrix(low), _matrix(close)
+
+    frame = pd.DataFrame(c)
+    sma_20 = frame.rolling(20).mean().to_numpy()
+    sma_50 = frame.rolling(50).mean().to_numpy()
+    recent_low = _rolling_extreme(l, 20, np.minimum, np.inf)
+    high_20 = _rolling_extreme(h, 20, np.maximum, -np.inf)
+    high_60 = _rolling_extreme(h, 60, np.maximum, -np.inf)
+    low_60 = _rolling_extreme(l, 60, np.minimum, np.inf)
+    fib_50 = high_60 - (high_60 - low_60) * 0.5
+    fib_618 = high_60 - (high_60 - low_60) * 0.618
+    breakout = c >= high_20 * 0.98
+
+    # Candidate levels in ENTRY_TYPES order; the notebook keeps the ones
+    # below the close (or the close itself on a breakout), closest first
+    candidates = np.stack([sma_20, sma_50, fib_50, np.where(breakout, c, np.nan)])
+    valid = np.stack([sma_20 < c, sma_50 < c, fib_50 < c, breakout])
+    distance = np.where(valid, np.abs(candidates - c), np.inf)
+    best = distance.argmin(axis=0)
+    has_level = np.isfinite(distance.min(axis=0))
+    best_entry = np.where(has_level, np.take_along_axis(candidates, best[None], axis=0)[0], np.nan)
+    best_type = np.where(has_level, np.asarray(ENTRY_TYPES, dtype=object)[best], None)
+
+    swings = swing_points(high, low, left, right)
+    levels = {
+        'SMA_20': sma_20,
+        'SMA_50': sma_50,
+        'Recent_Low': recent_low,
+        'High_20': high_20,
+        'High_60': high_60,
+        'Low_60': low_60,
+        'Fib_50': fib_50,
+        'Fib_618': fib_618,
+        'Breakout': breakout,
+        'Best_Entry': best_entry,
+        'Best_Type': best_type,
+        'Best_Distance_Pct': (best_entry - c) / c * 100,
+        'Last_Swing_High': _matrix(swings['Last_Swing_High']),
+        'Last_Swing_Low': _matrix(swings['Last_Swing_Low']),
+    }
+
+    if isinstance(close, pd.DataFrame):
+        return {name: pd.DataFrame(values, index=close.index, columns=close.columns)
+                for name, values in levels.items()}
+    return pd.DataFrame({name: values[:, 0] for name, values in levels.items()}, index=close.index)
@@ -8,16 +8,23 @@ Checks:
 - Market breadth (% stocks above 200-day MA)
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from providers import YahooProvider
+
 
 class MarketRegime:
     """Detects market regime (bull, neutral, bear)"""
 
-    def __init__(self):
+    def __init__(self, provider=None):
+        """
+        Args:
+            provider: Data provider with history(ticker, period)
+                      (default: YahooProvider)
+        """
+        self.provider = provider if provider is not None else YahooProvider()
         self.cache = {}
         self.cache_time = None
         self.cache_duration = timedelta(hours=1)
@@ -32,17 +39,11 @@ class MarketRegime:
             (now - self.cache_time) < self.cache_duration):
             return self.cache[cache_key]
 
-        try:
-            data = yf.download(ticker, period=period, progress=False)
-            if not data.empty:
-                # Flatten multi-level columns if present
-                if isinstance(data.columns, pd.MultiIndex):
-                    data.columns = data.columns.get_level_values(0)
-                self.cache[cache_key] = data
-                self.cache_time = now
-                return data
-        except:
-            pass
+        data = self.provider.history(ticker, period=period)
+        if data is not None and not data.empty:
+            self.cache[cache_key] = data
+            self.cache_time = now
+            return data
 
         return None
 
@@ -277,18 +278,19 @@ class MarketRegime:
         }
 
 
-def check_market_health(verbose=True, check_breadth=False):
+def check_market_health(verbose=True, check_breadth=False, provider=None):
     """
     Quick function to check market health
 
     Args:
         verbose: bool - Print details
         check_breadth: bool - Include breadth check (slower)
+        provider: Data provider (default: YahooProvider)
 
     Returns:
         dict - Market regime data
     """
-    regime = MarketRegime()
+    regime = MarketRegime(provider)
     result = regime.get_regime(check_breadth=check_breadth)
 
     if verbose:
@@ -0,0 +1,442 @@
+"""
+ML Model Training
+
+Purged walk-forward cross-validation for the horizon-based labels built by
+FeatureEngineer.create_target.
+
+- Purging: a label at bar t looks `horizon` bars ahead, so training rows whose
+  label window reaches into the test block are dropped.
+- Embargo: an extra gap of bars between training and test data.
+- Splits are made on dates, so a stacked multi-ticker panel is split by time
+  and never trains on one ticker's future while testing on another's past.
+
+Folds run in a joblib process pool. The feature matrix is handed to the
+workers as one read-only memory map instead of a copy per fold. Folds are
+grouped into contiguous chains, and within a chain the boosted models
+warm-start from the previous fold's booster (cut back to its best
+iteration) with early stopping, so each fold only adds the trees the new
+data needs. The chain layout is a
+parameter rather than the worker count, so results do not depend on the
+number of cores.
+"""
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+
+from features import feature_columns, label_horizon, resolved_column
+
+
+MODEL_TYPES = ('lightgbm', 'xgboost', 'random_forest')
+
+# Warm-start chains trained in parallel by default. Fixed rather than taken
+# from the core count, so fold results are the same on every machine.
+DEFAULT_CHAINS = 4
+
+DEFAULT_PARAMS = {
+    'lightgbm': {
+        'learning_rate': 0.05,
+        'num_leaves': 31,
+        'min_data_in_leaf': 50,
+        'feature_fraction': 0.8,
+        'bagging_fraction': 0.8,
+        'bagging_freq': 1,
+        'num_threads': 1,
+        'verbose': -1,
+    },
+    'xgboost': {
+        'eta': 0.05,
+        'max_depth': 5,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'tree_method': 'hist',
+        'nthread': 1,
+    },
+    'random_forest': {
+        'n_estimators': 300,
+        'max_depth': 8,
+        'min_samples_leaf': 20,
+        'n_jobs': 1,
+        'random_state': 42,
+    },
+}
+
+
+def prepare_training_data(frames, feature_cols=None, target_col='Target'):
+    """
+    Stack per-ticker feature frames into one time-ordered training matrix
+
+    Args:
+        frames: dict of ticker -> DataFrame from FeatureEngineer (build_all_features)
+        feature_cols: Columns to use (default: features.feature_columns)
+        target_col: Label column
+
+    Returns:
+        dict with:
+            - X: float32 array (rows x features), sorted by date
+            - y: label array
+            - times: datetime64 array, one per row
+            - tickers: ticker per row
+            - feature_names: list of column names
+            - horizon: bars the label looks ahead (from the column name, or
+              the trailing unresolved rows for plain Target), None if unknown
+    """
+    if feature_cols is None:
+        first = next(iter(frames.values()))
+        feature_cols = feature_columns(first.columns)
+
+    horizon = label_horizon(target_col)
+    parts = []
+    for ticker, df in frames.items():
+        # Rows whose future return is still unknown carry placeholder labels
+        required = feature_cols + [target_col]
+        resolved = resolved_column(target_col, df.columns)
+        if resolved is not None:
+            required = required + [resolved]
+            if label_horizon(target_col) is None:
+                # The last `horizon` rows are the ones still waiting for their future bars
+                known = np.flatnonzero(df[resolved].notna().to_numpy())
+                unresolved = len(df) - (known[-1] + 1) if len(known) else 0
+                horizon = max(horizon or 0, unresolved) or None
+        part = df[feature_cols + [target_col]][df[required].notna().all(axis=1)]
+        part = part.assign(_ticker=ticker)
+        index = pd.DatetimeIndex(part.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        part.index = index
+        parts.append(part)
+
+    panel = pd.concat(parts).sort_index(kind='stable')
+
+    return {
+        'X': np.ascontiguousarray(panel[feature_cols].to_numpy(dtype=np.float32)),
+        'y': panel[target_col].to_numpy(),
+        'times': panel.index.to_numpy(),
+        'tickers': panel['_ticker'].to_numpy(),
+        'feature_names': list(feature_cols),
+        'horizon': horizon,
+    }
+
+
+class PurgedWalkForward:
+    """Expanding-window walk-forward splitter with purging and embargo"""
+
+    def __init__(self, n_splits=5, horizon=1, embargo=0, min_train_periods=None):
+        """
+        Args:
+            n_splits: Number of sequential test blocks
+            horizon: Label horizon in bars (FeatureEngineer target_horizon)
+            embargo: Extra bars dropped between training and test data
+            min_train_periods: Bars in the first training window
+                               (default: one test block's worth)
+        """
+        self.n_splits = n_splits
+        self.horizon = horizon
+        self.embargo = embargo
+        self.min_train_periods = min_train_periods
+
+    def _periods(self, times):
+        """Map rows to sorted unique periods; returns (order, row boundaries, count)"""
+        _, period = np.unique(times, return_inverse=True)
+        order = np.argsort(period, kind='stable')
+        n_periods = int(period.max()) + 1
+        bounds = np.searchsorted(period[order], np.arange(n_periods + 1))
+        return order, bounds, n_periods
+
+    def test_edges(self, n_periods):
+        """Period boundaries of the test blocks"""
+        first = self.min_train_periods or n_periods // (self.n_splits + 1)
+        if first + self.horizon + self.embargo >= n_periods:
+            raise ValueError("Not enough history for the requested splits")
+        return np.linspace(first, n_periods, self.n_splits + 1).astype(int)
+
+    def split(self, times):
+        """
+        Yield (train_rows, test_rows) index arrays
+
+        Args:
+            times: Date (or bar number) of every row; rows sharing a date
+                   always land on the same side of a split
+        """
+        order, bounds, n_periods = self._periods(np.asarray(times))
+        edges = self.test_edges(n_periods)
+
+        for test_start, test_end in zip(edges[:-1], edges[1:]):
+            # Label at period p covers (p, p + horizon], keep p + horizon < test_start
+            train_end = max(test_start - self.horizon - self.embargo, 0)
+            yield order[:bounds[train_end]], order[bounds[test_start]:bounds[test_end]]
+
+    def split_with_validation(self, times, val_fraction=0.15):
+        """
+        Like split(), but carve a purged early-stopping set off the end of
+        each training window: yields (fit_rows, val_rows, test_rows)
+        """
+        order, bounds, n_periods = self._periods(np.asarray(times))
+        edges = self.test_edges(n_periods)
+
+        for test_start, test_end in zip(edges[:-1], edges[1:]):
+            train_end = max(test_start - self.horizon - self.embargo, 0)
+            n_val = int(train_end * val_fraction)
+            fit_end = max(train_end - n_val - self.horizon, 0)
+            yield (order[:bounds[fit_end]],
+                   order[bounds[train_end - n_val]:bounds[train_end]],
+                   order[bounds[test_start]:bounds[test_end]])
+
+
+def _boost_lightgbm(X, y, folds, task, n_classes, params, num_boost_round,
+                    early_stopping_rounds, warm_start):
+    import lightgbm as lgb
+
+    params = {**DEFAULT_PARAMS['lightgbm'], **params}
+    if task == 'classification':
+        params.update(objective='multiclass', num_class=n_classes)
+    else:
+        params.update(objective='regression')
+
+    # One binned dataset per worker; folds take row subsets of it
+    full = lgb.Dataset(X, label=y, free_raw_data=False, params=params).construct()
+
+    booster = None
+    for fit_rows, val_rows, test_rows in folds:
+        train_set = full.subset(np.sort(fit_rows))
+        callbacks = []
+        valid_sets = []
+        if early_stopping_rounds and len(val_rows):
+            valid_sets = [full.subset(np.sort(val_rows))]
+            callbacks = [lgb.early_stopping(early_stopping_rounds, verbose=False)]
+        booster = lgb.train(params, train_set, num_boost_round=num_boost_round,
+                            valid_sets=valid_sets, callbacks=callbacks,
+                            init_model=booster if warm_start else None,
+                            keep_training_booster=True)
+        best = booster.best_iteration or booster.current_iteration()
+        # Drop the trees early stopping rejected, so the next fold warm-starts
+        # from this fold's best model rather than from all of them
+        booster = lgb.Booster(model_str=booster.model_to_string(num_iteration=best))
+        yield booster, booster.predict(X[test_rows]), best
+
+
+def _boost_xgboost(X, y, folds, task, n_classes, params, num_boost_round,
+                   early_stopping_rounds, warm_start):
+    import xgboost as xgb
+
+    params = {**DEFAULT_PARAMS['xgboost'], **params}
+    if task == 'classification':
+        params.update(objective='multi:softprob', num_class=n_classes)
+    else:
+        params.update(objective='reg:squarederror')
+
+    full = xgb.DMatrix(X, label=y)
+
+    booster = None
+    for fit_rows, val_rows, test_rows in folds:
+        train_set = full.slice(np.sort(fit_rows))
+        evals = []
+        if early_stopping_rounds and len(val_rows):
+            evals = [(full.slice(np.sort(val_rows)), 'valid')]
+        booster = xgb.train(params, train_set, num_boost_round=num_boost_round,
+                            evals=evals,
+                            early_stopping_rounds=early_stopping_rounds if evals else None,
+                            xgb_model=booster if warm_start else None,
+                            verbose_eval=False)
+        best = getattr(booster, 'best_iteration', None)
+        best = booster.num_boosted_rounds() if best is None else best + 1
+        # Keep only the best rounds (see _boost_lightgbm)
+        booster = booster[:best]
+        yield booster, booster.predict(full.slice(test_rows)), best
+
+
+def _random_forest(X, y, folds, task, n_classes, params, num_boost_round,
+                   early_stopping_rounds, warm_start):
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    params = {**DEFAULT_PARAMS['random_forest'], **params}
+    for fit_rows, val_rows, test_rows in folds:
+        # Forests have no early stopping; the validation rows are trained on
+        rows = np.sort(np.concatenate([fit_rows, val_rows]))
+        if task == 'classification':
+            model = RandomForestClassifier(**params).fit(X[rows], y[rows])
+            # Map to the global class columns (a fold may miss a class)
+            proba = np.zeros((len(test_rows), n_classes))
+            proba[:, model.classes_.astype(int)] = model.predict_proba(X[test_rows])
+            yield model, proba, params['n_estimators']
+        else:
+            model = RandomForestRegressor(**params).fit(X[rows], y[rows])
+            yield model, model.predict(X[test_rows]), params['n_estimators']
+
+
+_TRAINERS = {
+    'lightgbm': _boost_lightgbm,
+    'xgboost': _boost_xgboost,
+    'random_forest': _random_forest,
+}
+
+
+def _run_chain(X, y, folds, model_type, task, n_classes, params, num_boost_round,
+               early_stopping_rounds, warm_start, keep_models):
+    """Train a contiguous run of folds in one worker process"""
+    trainer = _TRAINERS[model_type]
+    results = []
+    for model, pred, best in trainer(X, y, folds, task, n_classes, params, num_boost_round,
+                                     early_stopping_rounds, warm_start):
+        results.append({
+            'pred': pred,
+            'best_iteration': best,
+            'model': model if keep_models else None,
+        })
+    return results
+
+
+def _fold_metrics(y_true, pred, task, classes):
+    if task == 'classification':
+        hit = classes[pred.argmax(axis=1)] == y_true
+        metrics = {'accuracy': hit.mean()}
+        for label in classes:
+            called = classes[pred.argmax(axis=1)] == label
+            metrics[f'precision_{label}'] = (
+                (y_true[called] == label).mean() if called.any() else np.nan
+            )
+        return metrics
+
+    return {
+        'rmse': float(np.sqrt(np.mean((pred - y_true) ** 2))),
+        'ic': pd.Series(pred).corr(pd.Series(y_true), method='spearman'),
+    }
+
+
+def predict_matrix(model, X, n_classes=None):
+    """
+    Predict with any model walk_forward_cv() trains
+
+    Args:
+        model: Fitted LightGBM/XGBoost booster or scikit-learn estimator
+        X: Feature matrix (rows x features)
+        n_classes: Total classes, so a forest that never saw one class
+                   still returns a full probability matrix
+
+    Returns class probabilities (rows x classes) for classifiers and
+    predicted values for regressors. Boosters trained with early stopping
+    predict with their best iteration, as in the CV folds.
+    """
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(X)
+        if n_classes is None:
+            return proba
+        full = np.zeros((len(X), n_classes))
+        full[:, model.classes_.astype(int)] = proba
+        return full
+    if type(model).__module__.startswith('xgboost'):
+        import xgboost as xgb
+        # Early-stopped boosters keep the trees past the best round;
+        # LightGBM's predict stops at best_iteration by itself
+        best = getattr(model, 'best_iteration', None)
+        iteration_range = (0, 0) if best is None else (0, best + 1)
+        return model.predict(xgb.DMatrix(X), iteration_range=iteration_range)
+    return model.predict(X)
+
+
+def walk_forward_cv(data, model_type='lightgbm', task='classification', n_splits=5,
+                    horizon=None, embargo=0, params=None, num_boost_round=1000,
+                    early_stopping_rounds=50, val_fraction=0.15, warm_start=True,
+                    n_chains=None, n_jobs=-1, keep_models=False):
+    """
+    Purged walk-forward cross-validation
+
+    Args:
+        data: dict from prepare_training_data()
+        model_type: 'lightgbm' | 'xgboost' | 'random_forest'
+        task: 'classification' (Target -1/0/1) or 'regression'
+        n_splits: Number of walk-forward test blocks
+        horizon: Label horizon in bars, purged between train and test
+                 (default: data['horizon'], else 1); shorter than the
+                 label's horizon raises, since it would leak label overlap
+        embargo: Extra bars dropped between train and test
+        params: Model parameters, merged over DEFAULT_PARAMS
+        num_boost_round: Max trees added per fold (boosted models)
+        early_stopping_rounds: Patience on the purged validation tail (None = off)
+        val_fraction: Share of each training window used for early stopping
+        warm_start: Continue each fold's booster from the previous fold in the chain
+        n_chains: Contiguous fold chains, trained in parallel; warm starts
+                  only run within a chain (default: DEFAULT_CHAINS with
+                  warm_start, else one per fold; random_forest never
+                  warm-starts and always gets one chain per fold)
+        n_jobs: Worker processes (-1 = all cores), at most one per chain;
+                results do not depend on it
+        keep_models: Return the fitted model of every fold
+
+    Returns:
+        dict with:
+            - folds: DataFrame of per-fold sizes, dates, best iteration and metrics
+            - oof: out-of-fold predictions (class probabilities for
+                   classification), NaN for rows never tested
+            - classes: label order of the probability columns
+            - models: list of fitted models (if keep_models)
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"model_type must be one of {MODEL_TYPES}")
+
+    label = data.get('horizon')
+    if horizon is None:
+        horizon = label or 1
+    elif label is not None and horizon < label:
+        raise ValueError(f"horizon={horizon} is shorter than the label's {label} bars; "
+                         f"purging would leak overlapping labels into the test folds")
+
+    X, y, times = data['X'], data['y'], data['times']
+    splitter = PurgedWalkForward(n_splits=n_splits, horizon=horizon, embargo=embargo)
+    folds = list(splitter.split_with_validation(times, val_fraction))
+
+    if task == 'classification':
+        classes = np.unique(y)
+        y_fit = np.searchsorted(classes, y).astype(np.float32)
+        oof = np.full((len(y), len(classes)), np.nan)
+    else:
+        classes = None
+        y_fit = y.astype(np.float32)
+        oof = np.full(len(y), np.nan)
+    n_classes = 0 if classes is None else len(classes)
+
+    if model_type == 'random_forest' or not warm_start:
+        n_chains = len(folds)
+    elif n_chains is None:
+        n_chains = DEFAULT_CHAINS
+    n_chains = max(1, min(n_chains, len(folds)))
+    chains = [list(chain) for chain in np.array_split(np.arange(len(folds)), n_chains)]
+    n_workers = min(effective_n_jobs(n_jobs), n_chains)
+
+    print(f"Walk-forward CV: {len(folds)} folds in {n_chains} chain(s), {model_type}, "
+          f"{n_workers} worker(s), horizon={horizon}, embargo={embargo}")
+
+    # Arrays above max_nbytes are memory-mapped once and shared by all workers
+    chain_results = Parallel(n_jobs=n_workers, max_nbytes='1M', mmap_mode='r')(
+        delayed(_run_chain)(X, y_fit, [folds[i] for i in chain], model_type, task,
+                            n_classes, params or {}, num_boost_round,
+                            early_stopping_rounds, warm_start, keep_models)
+        for chain in chains
+    )
+
+    rows = []
+    models = []
+    for chain, results in zip(chains, chain_results):
+        for fold_id, result in zip(chain, results):
+            fit_rows, val_rows, test_rows = folds[fold_id]
+            oof[test_rows] = result['pred']
+            models.append(result['model'])
+            rows.append({
+                'fold': fold_id,
+                'train_size': len(fit_rows) + len(val_rows),
+                'test_size': len(test_rows),
+                'test_start': times[test_rows].min(),
+                'test_end': times[test_rows].max(),
+                'best_iteration': result['best_iteration'],
+                **_fold_metrics(y[test_rows], result['pred'], task, classes),
+            })
+
+    fold_table = pd.DataFrame(rows).set_index('fold')
+    print(fold_table.to_string(float_format='{:.4f}'.format))
+
+    return {
+        'folds': fold_table,
+        'oof': oof,
+        'classes': classes,
+        'models': models if keep_models else None,
+    }
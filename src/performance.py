@@ -0,0 +1,370 @@
+"""
+Performance Analytics
+
+Vectorized metrics for many backtests at once. Equity curves are aligned
+into one 2-D array (dates x strategies/tickers) and every metric is a
+column-wise array operation, so a parameter sweep is scored in one call
+instead of one notebook cell per ticker.
+
+Also includes a Monte Carlo trade-order bootstrap that resamples tens of
+thousands of trade sequences as a single (paths x trades) array to
+estimate drawdown and risk-of-ruin distributions.
+"""
+
+import pandas as pd
+import numpy as np
+
+
+def equity_matrix(curves):
+    """
+    Align equity curves into one DataFrame (dates x curves)
+
+    Args:
+        curves: dict of name -> equity curve. Each curve may be a Series,
+                a DataFrame with an 'Equity' column (and optional 'Date'
+                column, as returned by backtest_strategy), or a list of
+                {'Date', 'Equity'} dicts
+
+    Returns:
+        DataFrame, forward-filled after each curve starts
+    """
+    columns = {}
+    for name, curve in curves.items():
+        if isinstance(curve, list):
+            curve = pd.DataFrame(curve)
+        if isinstance(curve, pd.DataFrame):
+            if 'Date' in curve.columns:
+                curve = curve.set_index('Date')
+            curve = curve['Equity']
+        columns[name] = curve
+    return pd.concat(columns, axis=1).sort_index().ffill()
+
+
+def _as_frame(equity):
+    if isinstance(equity, pd.Series):
+        return equity.to_frame()
+    if isinstance(equity, pd.DataFrame):
+        return equity
+    return pd.DataFrame(np.asarray(equity, dtype=float).reshape(len(equity), -1))
+
+
+def drawdowns(equity):
+    """
+    Drawdown from the running peak for every curve
+
+    Returns:
+        DataFrame of drawdowns (0 at peaks, negative fractions below)
+    """
+    equity = _as_frame(equity)
+    values = equity.to_numpy(dtype=float)
+    peak = np.fmax.accumulate(values, axis=0)
+    return pd.DataFrame(values / peak - 1, index=equity.index, columns=equity.columns)
+
+
+def performance_metrics(equity, periods_per_year=252, risk_free=0.0):
+    """
+    Summary metrics for every equity curve at once
+
+    Args:
+        equity: DataFrame of equity curves (dates x curves), see equity_matrix()
+        periods_per_year: Bars per year for annualisation (252 = daily)
+        risk_free: Annual risk-free rate for Sharpe/Sortino
+
+    Returns:
+        DataFrame indexed by curve with:
+            - Total_Return, CAGR, Volatility, Sharpe, Sortino
+            - Max_Drawdown, Max_DD_Duration (bars under water)
+            - Calmar, Pct_Positive (share of up periods)
+    """
+    equity = _as_frame(equity)
+    values = equity.to_numpy(dtype=float)
+    n_valid = np.isfinite(values).sum(axis=0)
+
+    first = equity.bfill().iloc[0].to_numpy(dtype=float)
+    last = equity.ffill().iloc[-1].to_numpy(dtype=float)
+    total_return = last / first - 1
+
+    if isinstance(equity.index, pd.DatetimeIndex):
+        starts = equity.index[np.isfinite(values).argmax(axis=0)]
+        years = (equity.index[-1] - starts).days.to_numpy() / 365.25
+    else:
+        years = (n_valid - 1) / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(years > 0, (last / first) ** (1 / years) - 1, np.nan)
+
+    returns = values[1:] / values[:-1] - 1
+    excess = returns - risk_free / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nanmean(excess, axis=0)
+        volatility = np.nanstd(returns, axis=0, ddof=1)
+        sharpe = mean / volatility * np.sqrt(periods_per_year)
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0) ** 2, axis=0))
+        sortino = mean / downside * np.sqrt(periods_per_year)
+        pct_positive = np.nansum(returns > 0, axis=0) / np.isfinite(returns).sum(axis=0)
+
+    dd = drawdowns(equity).to_numpy()
+    max_drawdown = np.fmin.reduce(dd, axis=0)
+
+    # Bars since the last peak; its maximum is the longest time under water
+    rows = np.arange(len(values))[:, None]
+    last_peak = np.maximum.accumulate(np.where(dd < 0, 0, rows), axis=0)
+    max_duration = (rows - last_peak).max(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calmar = np.where(max_drawdown < 0, cagr / -max_drawdown, np.nan)
+
+    return pd.DataFrame({
+        'Total_Return': total_return,
+        'CAGR': cagr,
+        'Volatility': volatility * np.sqrt(periods_per_year),
+        'Sharpe': sharpe,
+        'Sortino': sortino,
+        'Max_Drawdown': max_drawdown,
+        'Max_DD_Duration': max_duration,
+        'Calmar': calmar,
+        'Pct_Positive': pct_positive,
+    }, index=equity.columns)
+
+
+def trade_matrix(trades, column='PnL_Pct'):
+    """
+    Pad per-strategy trade results into one array (trades x strategies)
+
+    Args:
+        trades: dict of name -> list of trade dicts, DataFrame or array of returns
+        column: Trade field to use when trades are dicts/DataFrames
+
+    Returns:
+        DataFrame, NaN below each strategy's last trade
+    """
+    columns = {}
+    for name, values in trades.items():
+        if isinstance(values, list):
+            values = pd.DataFrame(values)
+        if isinstance(values, pd.DataFrame):
+            values = values[column]
+        columns[name] = pd.Series(np.asarray(values, dtype=float))
+    return pd.DataFrame(columns)
+
+
+def trade_metrics(trade_returns):
+    """
+    Win rate and expectancy statistics for many strategies at once
+
+    Args:
+        trade_returns: DataFrame (trades x strategies, NaN padded), see trade_matrix()
+
+    Returns:
+        DataFrame indexed by strategy with:
+            - Trades, Win_Rate, Avg_Win, Avg_Loss
+            - Expectancy (mean result per trade), Profit_Factor
+    """
+    trade_returns = _as_frame(trade_returns)
+    r = trade_returns.to_numpy(dtype=float)
+    valid = np.isfinite(r)
+    wins = np.where(valid & (r > 0), r, 0)
+    losses = np.where(valid & (r <= 0), r, 0)
+    n_trades = valid.sum(axis=0)
+    n_wins = (valid & (r > 0)).sum(axis=0)
+    n_losses = n_trades - n_wins
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = n_wins / n_trades
+        avg_win = wins.sum(axis=0) / n_wins
+        avg_loss = losses.sum(axis=0) / n_losses
+        expectancy = np.nansum(r, axis=0) / n_trades
+        profit_factor = np.where(losses.sum(axis=0) < 0,
+                                 wins.sum(axis=0) / -losses.sum(axis=0), np.inf)
+
+    return pd.DataFrame({
+        'Trades': n_trades,
+        'Win_Rate': win_rate,
+        'Avg_Win': avg_win,
+        'Avg_Loss': avg_loss,
+        'Expectancy': expectancy,
+        'Profit_Factor': profit_factor,
+    }, index=trade_returns.columns)
+
+
+def _rolling_drawdown(values, window):
+    """
+    Max drawdown and longest time under water inside each trailing window
+
+    Walks the window offsets once, keeping a running peak per window start,
+    so memory stays at (dates x curves) instead of a strided
+    (dates x curves x window) view.
+    """
+    n = len(values)
+    max_dd = np.full(values.shape, np.nan)
+    max_duration = np.full(values.shape, np.nan)
+    if n <= window:
+        return max_dd, max_duration
+
+    span = n - window
+    peak = values[:span].copy()
+    worst = np.where(np.isnan(peak), np.nan, 0.0)
+    under = np.zeros(peak.shape)
+    longest = np.zeros(peak.shape)
+    dd = np.empty(peak.shape)
+    below = np.empty(peak.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for k in range(1, window + 1):
+            current = values[k:k + span]
+            np.fmax(peak, current, out=peak)
+            np.divide(current, peak, out=dd)
+            dd -= 1
+            np.fmin(worst, dd, out=worst)
+            # Bars since the window's running peak, reset when back at it
+            np.less(dd, 0, out=below)
+            under += 1
+            under *= below
+            np.maximum(longest, under, out=longest)
+
+    max_dd[window:] = worst
+    max_duration[window:] = np.where(np.isnan(worst), np.nan, longest)
+    return max_dd, max_duration
+
+
+def _rolling_trades(trades, index, columns, window, date_column, column):
+    """Win rate and expectancy of the trades closed in each trailing window"""
+    count = np.zeros((len(index), len(columns)))
+    wins = np.zeros_like(count)
+    total = np.zeros_like(count)
+    for j, name in enumerate(columns):
+        frame = trades.get(name)
+        if frame is None:
+            continue
+        frame = pd.DataFrame(frame)
+        if frame.empty:
+            continue
+        result = frame[column].to_numpy(dtype=float)
+        rows = index.searchsorted(pd.DatetimeIndex(frame[date_column]))
+        keep = (rows < len(index)) & np.isfinite(result)
+        np.add.at(count[:, j], rows[keep], 1)
+        np.add.at(wins[:, j], rows[keep], result[keep] > 0)
+        np.add.at(total[:, j], rows[keep], result[keep])
+
+    def trailing(values):
+        return pd.DataFrame(values, index=index, columns=columns).rolling(window).sum()
+
+    count = trailing(count).where(lambda c: c > 0)
+    return trailing(wins) / count, trailing(total) / count
+
+
+def rolling_metrics(equity, window=63, periods_per_year=252, trades=None,
+                    date_column='Exit_Date', column='PnL_Pct'):
+    """
+    Rolling versions of the performance and trade metrics
+
+    Args:
+        equity: DataFrame of equity curves (dates x curves)
+        window: Lookback in bars (63 = one quarter of daily bars)
+        periods_per_year: Bars per year for annualisation
+        trades: Optional dict of curve name -> trade list/DataFrame (as for
+                trade_matrix) with a date column; adds trade-based Win_Rate
+                and Expectancy over the trades closed inside each window
+        date_column: Trade field with the close date
+        column: Trade result field
+
+    Returns:
+        dict of metric name -> DataFrame (dates x curves), NaN until
+        `window` bars are available:
+            - Return, CAGR, Sharpe, Sortino
+            - Max_Drawdown, Max_DD_Duration (bars under water in the window)
+            - Pct_Positive (share of up periods)
+            - Win_Rate, Expectancy (with trades; NaN for windows without trades)
+    """
+    equity = _as_frame(equity)
+    returns = equity.pct_change(fill_method=None)
+    roll = returns.rolling(window)
+    mean = roll.mean()
+
+    downside = np.sqrt(returns.clip(upper=0).pow(2).rolling(window).mean())
+    period_return = equity / equity.shift(window) - 1
+    max_dd, max_duration = _rolling_drawdown(equity.to_numpy(dtype=float), window)
+
+    def frame(values):
+        return pd.DataFrame(values, index=equity.index, columns=equity.columns)
+
+    result = {
+        'Return': period_return,
+        'CAGR': (1 + period_return) ** (periods_per_year / window) - 1,
+        'Sharpe': mean / roll.std() * np.sqrt(periods_per_year),
+        'Sortino': mean / downside * np.sqrt(periods_per_year),
+        'Max_Drawdown': frame(max_dd),
+        'Max_DD_Duration': frame(max_duration),
+        'Pct_Positive': (returns > 0).astype(float).where(returns.notna()).rolling(window).mean(),
+    }
+    if trades is not None:
+        result['Win_Rate'], result['Expectancy'] = _rolling_trades(
+            trades, equity.index, equity.columns, window, date_column, column)
+    return result
+
+
+def bootstrap_trades(trade_returns, n_paths=10000, n_trades=None, position_size=1.0,
+                     ruin_level=0.5, replace=True, seed=None, keep_paths=False):
+    """
+    Monte Carlo resampling of trade order
+
+    All paths are drawn as one (paths x trades) index array and compounded
+    with a single cumprod, so 10,000+ paths cost one array operation.
+
+    Args:
+        trade_returns: Per-trade returns as fractions (0.05 = +5%); for
+                       notebook trade lists pass PnL_Pct / 100
+        n_paths: Number of simulated sequences
+        n_trades: Trades per path (default: number of observed trades)
+        position_size: Fraction of equity committed per trade
+        ruin_level: Equity fraction counted as ruin (0.5 = lose half)
+        replace: True = bootstrap with replacement, False = shuffle order only
+        seed: Random seed
+        keep_paths: Return the full equity path array
+
+    Returns:
+        dict with:
+            - final_equity: array (n_paths,) of ending equity (start = 1.0)
+            - max_drawdown: array (n_paths,) of worst peak-to-trough drawdown
+            - risk_of_ruin: share of paths that ever fall to ruin_level
+            - percentiles: DataFrame of 5/25/50/75/95th percentiles
+            - paths: (n_paths x n_trades + 1) equity array if keep_paths
+    """
+    r = np.asarray(trade_returns, dtype=float)
+    r = r[np.isfinite(r)]
+    if len(r) == 0:
+        raise ValueError("No trades to resample")
+    rng = np.random.default_rng(seed)
+
+    if replace:
+        n_trades = n_trades or len(r)
+        idx = rng.integers(0, len(r), size=(n_paths, n_trades))
+    else:
+        if n_trades not in (None, len(r)):
+            raise ValueError("Shuffling without replacement keeps every trade (n_trades=len)")
+        # Independent permutation per row in one shot
+        idx = rng.random((n_paths, len(r))).argsort(axis=1)
+
+    growth = 1 + position_size * r[idx]
+    paths = np.empty((n_paths, idx.shape[1] + 1))
+    paths[:, 0] = 1.0
+    np.cumprod(growth, axis=1, out=paths[:, 1:])
+
+    peak = np.maximum.accumulate(paths, axis=1)
+    max_drawdown = (paths / peak - 1).min(axis=1)
+    final_equity = paths[:, -1]
+    risk_of_ruin = (paths.min(axis=1) <= ruin_level).mean()
+
+    quantiles = [5, 25, 50, 75, 95]
+    percentiles = pd.DataFrame({
+        'Final_Equity': np.percentile(final_equity, quantiles),
+        'Max_Drawdown': np.percentile(max_drawdown, quantiles),
+    }, index=[f'p{q}' for q in quantiles])
+
+    result = {
+        'final_equity': final_equity,
+        'max_drawdown': max_drawdown,
+        'risk_of_ruin': risk_of_ruin,
+        'percentiles': percentiles,
+    }
+    if keep_paths:
+        result['paths'] = paths
+    return result
@@ -0,0 +1,166 @@
+"""
+Data Providers
+
+One interface for where OHLCV history comes from:
+- YahooProvider: yfinance downloads (what the notebooks use)
+- LocalProvider: CSV files on disk, one per ticker, for offline runs and tests
+- IncrementalProvider: keeps each ticker's history in memory on top of
+  another provider and only fetches bars from the last one kept onward
+
+All expose history(ticker, period, start=None) -> DataFrame or None, with
+the same period strings as yfinance ('1mo', '6mo', '1y', '3y', 'max', ...);
+start (a date) fetches bars from that date on instead of a period.
+"""
+
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+
+def _period_offset(period):
+    """'6mo' -> DateOffset(months=6); None for 'max'"""
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if match is None:
+        return None
+    n, unit = int(match.group(1)), match.group(2)
+    return {
+        'd': pd.DateOffset(days=n),
+        'wk': pd.DateOffset(weeks=n),
+        'mo': pd.DateOffset(months=n),
+        'y': pd.DateOffset(years=n),
+    }[unit]
+
+
+def _longer(period, other):
+    """The longer of two period strings ('max' is longest)"""
+    offsets = [_period_offset(p) for p in (period, other)]
+    if offsets[0] is None or offsets[1] is None:
+        return period if offsets[0] is None else other
+    reference = pd.Timestamp('2000-01-01')
+    return period if reference - offsets[0] <= reference - offsets[1] else other
+
+
+def _trim(data, period):
+    """Rows within `period` of the last bar"""
+    offset = _period_offset(period)
+    if offset is None:
+        return data
+    return data[data.index > data.index[-1] - offset]
+
+
+class YahooProvider:
+    """Daily bars from Yahoo Finance"""
+
+    def history(self, ticker, period='1y', start=None):
+        import yfinance as yf
+
+        try:
+            if start is not None:
+                data = yf.download(ticker, start=start, progress=False)
+            else:
+                data = yf.download(ticker, period=period, progress=False)
+        except Exception:
+            return None
+        if data is None or data.empty:
+            return None
+        # Flatten multi-level columns if present
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        return data
+
+
+class LocalProvider:
+    """
+    Bars from <directory>/<ticker>.csv (DataFrame.to_csv output, date index first)
+
+    Usage:
+        provider = LocalProvider('data/raw')
+        df = provider.history('AAPL', period='1y')
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def tickers(self):
+        """Tickers with a file in the directory"""
+        return sorted(path.stem for path in self.directory.glob('*.csv'))
+
+    def history(self, ticker, period='1y', start=None):
+        path = self.directory / f'{ticker}.csv'
+        if not path.exists():
+            return None
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        if data.empty:
+            return None
+
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+            return data if len(data) else None
+        return _trim(data, period)
+
+
+class IncrementalProvider:
+    """
+    In-memory history per ticker, extended with only the newest bars
+
+    The first request for a ticker loads its full period; later updates ask
+    the wrapped provider for bars from the last kept date on (re-reading
+    that bar, which may still have been forming) and splice them in, so a
+    refresh costs the new bars rather than the whole period.
+
+    Usage:
+        store = IncrementalProvider(YahooProvider(), period='2y')
+        changed = store.update('AAPL')       # True when new/revised bars arrived
+        df = store.history('AAPL', period='1y')
+    """
+
+    def __init__(self, provider, period='2y'):
+        """
+        Args:
+            provider: Provider with history(ticker, period, start=None)
+            period: History kept per ticker (longer requests extend it)
+        """
+        self.provider = provider
+        self.period = period
+        self.frames = {}
+        self._periods = {}
+        self._lock = threading.Lock()
+
+    def update(self, ticker, period=None):
+        """Fetch bars newer than the kept history; returns True if it changed"""
+        period = _longer(period or self.period, self.period)
+        with self._lock:
+            kept = self.frames.get(ticker)
+            kept_period = self._periods.get(ticker)
+
+        if kept is None or _longer(period, kept_period) != kept_period:
+            data = self.provider.history(ticker, period=period)
+            if data is None or data.empty:
+                return False
+        else:
+            period = kept_period
+            fresh = self.provider.history(ticker, period=period, start=kept.index[-1])
+            if fresh is None or fresh.empty:
+                return False
+            if (len(fresh) == 1 and fresh.index[0] == kept.index[-1]
+                    and fresh.equals(kept.iloc[-1:])):
+                return False
+            data = pd.concat([kept[kept.index < fresh.index[0]], fresh])
+
+        with self._lock:
+            self.frames[ticker] = _trim(data, period)
+            self._periods[ticker] = period
+        return True
+
+    def history(self, ticker, period='1y', start=None):
+        self.update(ticker, period)
+        with self._lock:
+            data = self.frames.get(ticker)
+        if data is None:
+            return None
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+            return data if len(data) else None
+        return _trim(data, period)
@@ -0,0 +1,329 @@
+"""
+Feature Screening
+
+Fast feature -> target information coefficient (IC) for feature selection
+over hundreds of candidate features, many horizons and a whole universe.
+
+Correlations are built from masked sufficient statistics (counts, sums,
+sums of squares and cross products), so each target costs a handful of
+matrix-vector products over the feature matrix instead of an O(F^2)
+df.corr(). NaNs are handled pairwise, like DataFrame.corr().
+
+- information_coefficient: pooled Pearson/Spearman IC of every feature
+- period_ic: IC per period (per date = cross-sectional across tickers,
+  or per month/quarter)
+- rolling_ic: IC over a rolling window of periods, pooled across tickers
+- screen_features: IC summary table for every label column of
+  FeatureEngineer frames (one ticker or a dict of tickers)
+
+Spearman ranks are computed once per feature matrix and reused for every
+target; ranks are taken over the whole sample (or within each period for
+cross-sectional IC) rather than re-ranked for each feature/target pair.
+Where the two columns have NaNs in different rows this differs from
+DataFrame.corr(method='spearman') by a few 1e-3 (under 5e-3 on
+FeatureEngineer output); Pearson IC matches it to rounding.
+"""
+
+import pandas as pd
+import numpy as np
+
+from features import feature_columns, resolved_column
+
+
+# Feature columns processed together; bounds the (rows x block) temporaries
+BLOCK_SIZE = 64
+
+
+def _prepare(X):
+    """Centred values with NaNs zeroed, plus the validity mask"""
+    values = np.asarray(X, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    valid = np.isfinite(values)
+    with np.errstate(invalid='ignore'):
+        centre = np.nanmean(np.where(valid, values, np.nan), axis=0)
+    centred = np.where(valid, values - np.nan_to_num(centre), 0.0)
+    return centred, valid.astype(float)
+
+
+def _corr(n, sx, sy, sxx, syy, sxy, min_periods=3):
+    """Pearson correlation from pairwise sums"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx ** 2 / n
+        var_y = syy - sy ** 2 / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr = np.where((n >= min_periods) & (var_x > 0) & (var_y > 0), corr, np.nan)
+    return np.clip(corr, -1, 1)
+
+
+def _sums(x0, xv, y, x0_sq=None):
+    """Pairwise sums of every feature column with one target (matrix-vector products)"""
+    yv = np.isfinite(y).astype(float)
+    y0 = np.where(yv > 0, y, 0.0)
+    y0 = np.where(yv > 0, y0 - (y0.sum() / max(yv.sum(), 1)), 0.0)
+    if x0_sq is None:
+        x0_sq = x0 ** 2
+    return (xv.T @ yv,        # n
+            x0.T @ yv,        # sum x
+            xv.T @ y0,        # sum y
+            x0_sq.T @ yv,     # sum x^2
+            xv.T @ (y0 ** 2), # sum y^2
+            x0.T @ y0)        # sum xy
+
+
+def _group_sums(x0, xv, y, starts):
+    """Pairwise sums per group of consecutive rows (rows sorted by group)"""
+    yv = np.isfinite(y).astype(float)[:, None]
+    y0 = np.where(yv > 0, np.nan_to_num(y)[:, None], 0.0)
+    y0 = np.where(yv > 0, y0 - y0.sum() / max(yv.sum(), 1), 0.0)
+    return tuple(np.add.reduceat(values, starts, axis=0) for values in (
+        xv * yv, x0 * yv, xv * y0, x0 ** 2 * yv, xv * y0 ** 2, x0 * y0))
+
+
+def _average_ranks(values):
+    """Average ranks (1-based) down each column, NaN kept; like DataFrame.rank()"""
+    # Sort rows of the transpose so every argsort runs over contiguous memory
+    v = np.ascontiguousarray(values.T)
+    m, n = v.shape
+    order = np.argsort(v, axis=1)
+    ordered = np.take_along_axis(v, order, axis=1)
+
+    # Ties share the mean of their first and last sorted position
+    new = np.empty((m, n), dtype=bool)
+    new[:, 0] = True
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=new[:, 1:])
+    ends = np.empty((m, n), dtype=bool)
+    ends[:, -1] = True
+    ends[:, :-1] = new[:, 1:]
+    positions = np.arange(n)
+    first = np.maximum.accumulate(np.where(new, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, positions, n)[:, ::-1], axis=1)[:, ::-1]
+
+    ranks = np.empty((m, n))
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    ranks[np.isnan(v)] = np.nan
+    return ranks.T
+
+
+def _ranks(X, groups=None):
+    """
+    Average ranks per column (within groups if given), NaN kept
+
+    Group ranks reuse the global ranks: sorting by (group, global rank)
+    keeps ties and order inside each group, so one more ranking pass minus
+    the number of valid values in earlier groups gives the rank in-group.
+    """
+    values = np.asarray(X, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    ranks = np.empty(values.shape)
+    for start in range(0, values.shape[1], BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        ranks[:, block] = _average_ranks(values[:, block])
+    if groups is None:
+        return ranks
+
+    codes, _ = pd.factorize(np.asarray(groups), sort=True)
+    valid = ~np.isnan(ranks)
+    counts = pd.DataFrame(valid).groupby(codes).sum().to_numpy()
+    before = np.vstack([np.zeros((1, counts.shape[1])), np.cumsum(counts, axis=0)[:-1]])
+
+    composite = codes[:, None] * (len(values) + 1.0) + ranks
+    for start in range(0, values.shape[1], BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        ranks[:, block] = _average_ranks(composite[:, block]) - before[codes, block]
+    return ranks
+
+
+def information_coefficient(X, y, method='pearson', min_periods=3):
+    """
+    Correlation of every feature with a target in one pass
+
+    Args:
+        X: DataFrame of features (rows x features)
+        y: Target Series / array aligned with X
+        method: 'pearson' or 'spearman'
+        min_periods: Minimum pairwise observations
+
+    Returns:
+        Series of IC indexed by feature
+    """
+    values, target = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+    if method == 'spearman':
+        values, target = _ranks(values), _ranks(target)[:, 0]
+    x0, xv = _prepare(values)
+    ic = _corr(*_sums(x0, xv, target), min_periods=min_periods)
+    return pd.Series(ic, index=getattr(X, 'columns', None), name='IC')
+
+
+def _period_keys(dates, by):
+    dates = pd.DatetimeIndex(dates)
+    if by == 'date':
+        return dates
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.to_period(by).start_time
+
+
+def period_ic(X, y, periods, method='pearson', min_periods=3):
+    """
+    IC per period
+
+    Args:
+        X: DataFrame of features (rows x features), rows from any number of tickers
+        y: Target aligned with X
+        periods: Period key for every row (dates for cross-sectional IC
+                 across tickers; month starts for monthly time-series IC)
+        method: 'pearson' or 'spearman' (ranks within each period)
+
+    Returns:
+        DataFrame (periods x features)
+    """
+    periods = np.asarray(periods)
+    values, target = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+    if method == 'spearman':
+        values, target = _ranks(values, periods), _ranks(target, periods)[:, 0]
+    sums, keys = _sorted_group_sums(values, target, periods)
+    return pd.DataFrame(_corr(*sums, min_periods=min_periods), index=keys,
+                        columns=getattr(X, 'columns', None))
+
+
+def _sorted_group_sums(values, target, periods):
+    """Group sums of the pairwise statistics, computed in feature blocks"""
+    order = np.argsort(periods, kind='stable')
+    keys, starts = np.unique(periods[order], return_index=True)
+    values, target = values[order], target[order]
+
+    blocks = []
+    for start in range(0, values.shape[1], BLOCK_SIZE):
+        x0, xv = _prepare(values[:, start:start + BLOCK_SIZE])
+        blocks.append(_group_sums(x0, xv, target, starts))
+    sums = tuple(np.hstack([block[i] for block in blocks]) for i in range(6))
+    return sums, keys
+
+
+def rolling_ic(X, y, window, periods=None, method='pearson', min_periods=None):
+    """
+    IC over a rolling window of periods, pooled across tickers
+
+    Per-period sums are computed once and rolled, so the cost does not
+    depend on the window length.
+
+    Args:
+        X: DataFrame of features; its index gives the periods if not passed
+        y: Target aligned with X
+        window: Periods per window (bars for one ticker, dates for a panel)
+        periods: Period key per row (default: X.index, or its 'Date' level)
+        method: 'pearson' or 'spearman' (ranks over the whole sample)
+        min_periods: Minimum pairwise observations per window (default: window)
+
+    Returns:
+        DataFrame (periods x features), NaN until the window is filled
+    """
+    if periods is None:
+        index = X.index
+        periods = index.get_level_values(-1) if isinstance(index, pd.MultiIndex) else index
+    periods = np.asarray(periods)
+    values, target = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+    if method == 'spearman':
+        values, target = _ranks(values), _ranks(target)[:, 0]
+
+    sums, keys = _sorted_group_sums(values, target, periods)
+    rolled = [pd.DataFrame(s).rolling(window, min_periods=1).sum().to_numpy() for s in sums]
+    ic = _corr(*rolled, min_periods=min_periods or window)
+    ic[:window - 1] = np.nan
+    return pd.DataFrame(ic, index=keys, columns=getattr(X, 'columns', None))
+
+
+def _label_columns(columns):
+    return [col for col in columns if str(col).startswith(('Target', 'Future_Returns', 'TB_'))]
+
+
+def screen_features(data, targets=None, features=None, method='spearman', by=None,
+                    min_periods=3):
+    """
+    Rank features by IC against every target
+
+    Args:
+        data: FeatureEngineer DataFrame, or dict of ticker -> DataFrame
+              (pooled across tickers)
+        targets: Label columns (default: all Target*, Future_Returns*, TB_* columns)
+        features: Feature columns (default: features.feature_columns)
+        method: 'spearman' (default) or 'pearson'
+        by: Period for the IC time series: 'date' = cross-sectional across
+            tickers (default for a dict), or a pandas period alias such as
+            'M' / 'Q' (default 'M' for one ticker)
+        min_periods: Minimum observations per correlation
+
+    Returns:
+        DataFrame indexed by (Target, Feature), sorted by |IC| within
+        each target, with:
+            - IC: pooled IC over all rows
+            - Mean_IC, IC_Std, ICIR (Mean_IC / IC_Std), t_stat
+            - Hit_Rate: share of periods whose IC has the sign of Mean_IC
+            - Periods: number of periods with an IC
+    """
+    if isinstance(data, dict):
+        frame = pd.concat(data, names=['Ticker', 'Date'])
+        dates = frame.index.get_level_values('Date')
+        by = by or 'date'
+    else:
+        frame = data
+        dates = frame.index
+        by = by or 'M'
+
+    if features is None:
+        features = feature_columns(frame.columns)
+    if targets is None:
+        targets = _label_columns(frame.columns)
+
+    X = frame[features].to_numpy(dtype=float)
+    periods = np.asarray(_period_keys(dates, by))
+
+    # Rank transforms once, reused for every target
+    if method == 'spearman':
+        pooled_x = _ranks(X)
+        period_x = _ranks(X, periods)
+    else:
+        pooled_x = period_x = X
+    x0, xv = _prepare(pooled_x)
+    x0_sq = x0 ** 2
+
+    tables = {}
+    for target in targets:
+        y = frame[target].to_numpy(dtype=float)
+        resolved = resolved_column(target, frame.columns)
+        if resolved is not None:
+            y = np.where(frame[resolved].notna().to_numpy(), y, np.nan)
+
+        if method == 'spearman':
+            pooled_y, period_y = _ranks(y)[:, 0], _ranks(y, periods)[:, 0]
+        else:
+            pooled_y = period_y = y
+
+        pooled = _corr(*_sums(x0, xv, pooled_y, x0_sq), min_periods=min_periods)
+        sums, _ = _sorted_group_sums(period_x, period_y, periods)
+        per_period = _corr(*sums, min_periods=min_periods)
+
+        n_periods = np.isfinite(per_period).sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_ic = np.where(n_periods > 0, np.nansum(per_period, axis=0) / n_periods, np.nan)
+            std_ic = np.sqrt(np.nansum((per_period - mean_ic) ** 2, axis=0) / (n_periods - 1))
+            icir = mean_ic / std_ic
+            hit_rate = (np.nansum(np.sign(per_period) == np.sign(mean_ic), axis=0)
+                        / n_periods)
+
+        table = pd.DataFrame({
+            'IC': pooled,
+            'Mean_IC': mean_ic,
+            'IC_Std': std_ic,
+            'ICIR': icir,
+            't_stat': icir * np.sqrt(n_periods),
+            'Hit_Rate': hit_rate,
+            'Periods': n_periods,
+        }, index=pd.Index(features, name='Feature'))
+        tables[target] = table.reindex(table['IC'].abs().sort_values(ascending=False).index)
+
+    return pd.concat(tables, names=['Target', 'Feature'])
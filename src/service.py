@@ -0,0 +1,328 @@
+"""
+Scan Service
+
+Long-running asyncio process that keeps the scan state hot in memory so a
+scan is a lookup instead of a notebook re-run:
+- OHLCV history per ticker (providers.IncrementalProvider)
+- Latest feature rows and technical scores (signals.calculate_improved_scores)
+- The current MarketRegime result
+
+Refreshes are incremental: each ticker's history is extended with only the
+bars since the last refresh, and only tickers whose bars changed are
+rescored. The new state is built in a worker thread and swapped in whole,
+so queries always read a consistent snapshot and answer in milliseconds.
+
+Queries are served as JSON over local HTTP (TCP or a Unix socket):
+    GET  /status                     snapshot time, universe size
+    GET  /regime                     current MarketRegime result
+    GET  /top?n=20&min_score=5       best setups
+    GET  /score?tickers=AAPL,MSFT    scores for specific tickers
+    POST /refresh                    rebuild now
+
+Usage:
+    python service.py --data-dir ../data/raw --port 8765
+    curl 'localhost:8765/top?n=20'
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import numpy as np
+
+from features import build_panels, latest_panel_features
+from market import MarketRegime
+from providers import IncrementalProvider, LocalProvider, YahooProvider
+from signals import calculate_improved_scores, rank_universe
+
+
+SETUP_COLUMNS = ['Price', 'Tech_Score', 'RSI_14', 'ADX', 'STOCH_K', 'SMA_20', 'SMA_50',
+                 'ATR_14', 'Volume_Ratio_20']
+
+
+def _records(frame):
+    """DataFrame -> {index: {column: value}} with NaN as null"""
+    return json.loads(frame.to_json(orient='index'))
+
+
+class ScanService:
+    """Hot in-memory scan state with scheduled refresh and query methods"""
+
+    def __init__(self, tickers, provider=None, period='2y', refresh_interval=900,
+                 check_breadth=False, model=None, feature_names=None, classes=None):
+        """
+        Args:
+            tickers: Watchlist to keep loaded
+            provider: Data provider with history(ticker, period, start=None)
+                      (default: YahooProvider; LocalProvider for offline/tests)
+            period: History to keep per ticker (>= ~1y for SMA_200)
+            refresh_interval: Seconds between scheduled refreshes
+            check_breadth: Include the breadth check in the regime
+            model: Optional fitted model; adds ML_Score via rank_universe
+            feature_names: Feature columns the model was trained on
+                           (required with a model)
+            classes: Label order of the model's probability columns
+        """
+        if model is not None and feature_names is None:
+            raise ValueError("feature_names is required when a model is given")
+
+        self.tickers = list(tickers)
+        self.provider = provider if provider is not None else YahooProvider()
+        self.store = IncrementalProvider(self.provider, period)
+        self.period = period
+        self.refresh_interval = refresh_interval
+        self.check_breadth = check_breadth
+        self.model = model
+        self.feature_names = feature_names
+        self.classes = classes
+
+        # Index/VIX history is kept and extended by the same store
+        self.market = MarketRegime(self.store)
+        self.snapshot = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresher = None
+        self._server = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    async def refresh(self):
+        """Fetch new bars for all tickers concurrently and swap in a new snapshot"""
+        async with self._refresh_lock:
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            changed = await asyncio.gather(*(
+                loop.run_in_executor(None, self.store.update, ticker)
+                for ticker in self.tickers
+            ))
+            changed = {ticker for ticker, flag in zip(self.tickers, changed) if flag}
+            snapshot = await loop.run_in_executor(None, self._build, changed)
+            snapshot['refresh_seconds'] = time.perf_counter() - started
+            self.snapshot = snapshot
+        return self.status()
+
+    def _score(self, frames):
+        """Setup rows (unranked) for the given tickers' histories"""
+        panels = build_panels(frames)
+        features = latest_panel_features(panels)
+        if self.model is not None:
+            setups = rank_universe(self.model, panels, self.feature_names, self.classes,
+                                   features=features).drop(columns='Rank')
+        else:
+            setups = pd.DataFrame({
+                'Price': panels['Close'].ffill().iloc[-1],
+                'Tech_Score': calculate_improved_scores(panels, features),
+            })
+        return setups.join(features[[c for c in SETUP_COLUMNS if c in features
+                                     and c not in setups]])
+
+    def _build(self, changed):
+        """Rescore changed tickers and refresh the regime (runs in a worker thread)"""
+        loaded = {ticker: self.store.frames[ticker] for ticker in self.tickers
+                  if ticker in self.store.frames}
+        missing = sorted(set(self.tickers) - set(loaded))
+
+        # Scores depend only on each ticker's own bars, so unchanged rows are reused
+        previous = (self.snapshot['setups'].drop(columns='Rank', errors='ignore')
+                    if self.snapshot is not None else pd.DataFrame())
+        stale = [ticker for ticker in loaded if ticker in changed or ticker not in previous.index]
+        parts = [previous.loc[[ticker for ticker in loaded if ticker not in stale]]]
+        if stale:
+            parts.append(self._score({ticker: loaded[ticker] for ticker in stale}))
+        parts = [part for part in parts if len(part)]
+
+        setups = pd.DataFrame(columns=SETUP_COLUMNS)
+        if parts:
+            setups = pd.concat(parts)
+            order = ['ML_Score', 'Tech_Score'] if self.model is not None else ['Tech_Score']
+            setups = setups.sort_values(order, ascending=False)
+            setups['Rank'] = np.arange(1, len(setups) + 1)
+
+        # Drop the regime's own 1-hour cache so every refresh sees new bars
+        self.market.cache.clear()
+        regime = self.market.get_regime(check_breadth=self.check_breadth)
+
+        return {
+            'setups': setups,
+            'regime': regime,
+            'missing': missing,
+            'recomputed': len(stale),
+            'last_bar': max((df.index[-1] for df in loaded.values()), default=None),
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as exc:
+                # Keep serving the previous snapshot
+                print(f"Refresh failed: {exc}")
+
+    # ------------------------------------------------------------------
+    # Queries (read the current snapshot only)
+    # ------------------------------------------------------------------
+
+    def _regime_summary(self):
+        regime = self.snapshot['regime']
+        return {key: regime[key] for key in ('regime', 'healthy', 'confidence', 'recommendation')}
+
+    def status(self):
+        if self.snapshot is None:
+            return {'ready': False}
+        last_bar = self.snapshot['last_bar']
+        return {
+            'ready': True,
+            'updated_at': self.snapshot['updated_at'],
+            'last_bar': None if last_bar is None else str(last_bar),
+            'tickers': len(self.snapshot['setups']),
+            'recomputed': self.snapshot['recomputed'],
+            'missing': self.snapshot['missing'],
+            'refresh_seconds': round(self.snapshot['refresh_seconds'], 3),
+            'market': self._regime_summary(),
+        }
+
+    def regime(self):
+        return self.snapshot['regime']
+
+    def top(self, n=20, min_score=None):
+        """Best n setups (by ML_Score when a model is loaded, else Tech_Score)"""
+        setups = self.snapshot['setups']
+        if min_score is not None:
+            setups = setups[setups['Tech_Score'] >= min_score]
+        return {
+            'market': self._regime_summary(),
+            'setups': _records(setups.head(n)),
+        }
+
+    def score(self, tickers):
+        """Scores for the requested tickers (unknown tickers listed as missing)"""
+        setups = self.snapshot['setups']
+        known = [ticker for ticker in tickers if ticker in setups.index]
+        return {
+            'market': self._regime_summary(),
+            'scores': _records(setups.loc[known]),
+            'missing': [ticker for ticker in tickers if ticker not in setups.index],
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP API
+    # ------------------------------------------------------------------
+
+    async def _dispatch(self, method, path, query):
+        if method == 'POST' and path == '/refresh':
+            return HTTPStatus.OK, await self.refresh()
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f'{method} not allowed'}
+        if path == '/status':
+            return HTTPStatus.OK, self.status()
+        if self.snapshot is None:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'no snapshot yet'}
+        if path == '/regime':
+            return HTTPStatus.OK, self.regime()
+        if path == '/top':
+            n = int(query.get('n', ['20'])[0])
+            min_score = query.get('min_score', [None])[0]
+            return HTTPStatus.OK, self.top(n, None if min_score is None else float(min_score))
+        if path == '/score':
+            tickers = [t.strip().upper() for t in query.get('tickers', [''])[0].split(',') if t.strip()]
+            return HTTPStatus.OK, self.score(tickers)
+        return HTTPStatus.NOT_FOUND, {'error': f'unknown path {path}'}
+
+    async def _handle(self, reader, writer):
+        """Minimal HTTP/1.1: one request per connection, JSON response"""
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            method, target, _ = request_line.split(' ', 2)
+            url = urlsplit(target)
+            status, body = await self._dispatch(method.upper(), url.path, parse_qs(url.query))
+        except ValueError as exc:
+            status, body = HTTPStatus.BAD_REQUEST, {'error': str(exc)}
+        except Exception as exc:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(exc)}
+
+        payload = json.dumps(body, default=str).encode()
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n'
+            f'Connection: close\r\n\r\n'.encode() + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """
+        Load the first snapshot, start the scheduler and listen
+
+        Args:
+            host, port: TCP address (ignored when path is given)
+            path: Unix socket path
+        """
+        await self.refresh()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        self._refresher = asyncio.create_task(self._refresh_loop())
+        return self._server
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None):
+        """start() and serve until cancelled"""
+        server = await self.start(host, port, path)
+        where = path or f'http://{host}:{port}'
+        print(f"Scan service ready on {where} ({len(self.snapshot['setups'])} tickers)")
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resident scan service')
+    parser.add_argument('--tickers', help='Comma-separated watchlist (default: all files in --data-dir)')
+    parser.add_argument('--data-dir', help='Serve from local CSVs instead of Yahoo Finance')
+    parser.add_argument('--period', default='2y')
+    parser.add_argument('--interval', type=int, default=900, help='Refresh interval in seconds')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', help='Unix socket path (instead of TCP)')
+    parser.add_argument('--breadth', action='store_true', help='Include the market breadth check')
+    args = parser.parse_args()
+
+    provider = LocalProvider(args.data_dir) if args.data_dir else YahooProvider()
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(',')]
+    elif args.data_dir:
+        tickers = [t for t in provider.tickers() if not t.startswith('^')]
+    else:
+        parser.error('--tickers is required without --data-dir')
+
+    service = ScanService(tickers, provider, period=args.period,
+                          refresh_interval=args.interval, check_breadth=args.breadth)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Signal Generation
+
+Universe-wide scoring from wide OHLCV panels (dates x tickers, see
+features.build_panels). Everything is computed for all tickers at once, on
+each ticker's own bars (features.align_panels), so tickers that miss a date
+or stop early are scored on their latest bar:
+- calculate_improved_scores: vectorized version of the notebooks'
+  calculate_improved_score (-15 to +15 technical score)
+- rank_universe: one model prediction over the stacked latest feature rows,
+  joined with the technical scores into a daily ranking
+"""
+
+import pandas as pd
+import numpy as np
+
+from features import align_panels, latest_panel_features
+from models import predict_matrix
+
+
+def _latest_extras(panels):
+    """Latest MFI, CMF, VWAP, squeeze and volatility percentile per ticker"""
+    high, low, close, volume = (panels[field] for field in ('High', 'Low', 'Close', 'Volume'))
+    tail = slice(-21, None)
+    h, l, c, v = high.iloc[tail], low.iloc[tail], close.iloc[tail], volume.iloc[tail]
+    typical = (h + l + c) / 3
+
+    # MFI (14)
+    money_flow = typical * v
+    positive = money_flow.where(typical > typical.shift(1), 0).iloc[-14:].sum(min_count=14)
+    negative = money_flow.where(typical < typical.shift(1), 0).iloc[-14:].sum(min_count=14)
+    mfi = 100 - (100 / (1 + positive / negative))
+
+    # CMF (20)
+    mfv = (((c - l) - (h - c)) / (h - l) * v).fillna(0)
+    cmf = mfv.iloc[-20:].sum() / v.iloc[-20:].sum()
+
+    # VWAP over the full history, as in indicators.vwap
+    full_typical = (high + low + close) / 3
+    vwap = (full_typical * volume).sum() / volume.sum()
+
+    # Squeeze: Bollinger(20, 2) inside Keltner(20 EMA, 10 ATR, 2x)
+    bb_middle = c.iloc[-20:].mean()
+    bb_std = c.iloc[-20:].std()
+    prev_close = c.shift()
+    tr = np.fmax(np.fmax(h - l, (h - prev_close).abs()), (l - prev_close).abs())
+    atr_10 = tr.iloc[-10:].mean()
+    kc_middle = close.ewm(span=20, adjust=False).mean().iloc[-1]
+    squeeze_on = ((bb_middle - 2 * bb_std > kc_middle - 2 * atr_10) &
+                  (bb_middle + 2 * bb_std < kc_middle + 2 * atr_10))
+
+    # Volatility percentile with the backtest's adaptive window
+    hist_vol = close.pct_change().rolling(20).std() * np.sqrt(252)
+    vol_windows = (close.notna().sum() - 200).clip(upper=120)
+    vol_pct = pd.Series(0.5, index=close.columns)
+    for window in vol_windows[vol_windows > 20].unique():
+        tickers = vol_windows.index[vol_windows == window]
+        recent = hist_vol[tickers].iloc[-window:]
+        current = recent.iloc[-1]
+        less = (recent < current).sum()
+        equal = (recent == current).sum()
+        pct = (less + (equal + 1) / 2) / window
+        vol_pct[tickers] = pct.where(recent.notna().sum() == window)
+
+    return pd.DataFrame({
+        'MFI': mfi,
+        'CMF': cmf,
+        'VWAP': vwap,
+        'Squeeze_On': squeeze_on,
+        'Vol_Percentile': vol_pct,
+    })
+
+
+def calculate_improved_scores(panels, features=None):
+    """
+    Composite technical score for every ticker's latest bar
+
+    Same rules and weights as calculate_improved_score in the swing trading
+    and backtesting notebooks, evaluated as array operations.
+    Score range: -15 to +15
+
+    Args:
+        panels: dict of field -> wide DataFrame (features.build_panels)
+        features: Output of latest_panel_features (computed if not given)
+
+    Returns:
+        Series of scores indexed by ticker
+    """
+    panels = align_panels(panels)
+    if features is None:
+        features = latest_panel_features(panels)
+    f = features.join(_latest_extras(panels))
+    close = panels['Close'].iloc[-1]
+
+    adx, plus_di, minus_di = f['ADX'], f['Plus_DI'], f['Minus_DI']
+    up = plus_di > minus_di
+
+    # 1. Trend strength
+    score = np.select(
+        [(adx > 25) & up, adx > 25, (adx > 20) & up, adx > 20],
+        [5, -5, 3, -3], 0).astype(float)
+
+    # 2. Momentum confluence
+    oversold = ((f['RSI_14'] < 40).astype(int) + (f['STOCH_K'] < 20) +
+                (f['MFI'] < 20) + (f['CCI_20'] < -100))
+    overbought = ((f['RSI_14'] > 60).astype(int) + (f['STOCH_K'] > 80) +
+                  (f['MFI'] > 80) + (f['CCI_20'] > 100))
+    score += np.select([oversold == 1, oversold == 2, oversold >= 3], [3, 5, 6], 0)
+    score -= np.select([overbought == 1, overbought == 2, overbought >= 3], [3, 5, 6], 0)
+
+    # 3. Volume confirmation
+    spike = f['Volume_Ratio_20'] > 1.5
+    score += np.where(spike & (f['CMF'] > 0.05), 2, 0)
+    score -= np.where(spike & (f['CMF'] < -0.05), 2, 0)
+
+    # 4. Price structure
+    sma_20, sma_50 = f['SMA_20'], f['SMA_50']
+    score += np.select(
+        [(close > sma_20) & (sma_20 > sma_50), (close < sma_20) & (sma_20 < sma_50),
+         close > sma_20, close < sma_20],
+        [3, -3, 2, -2], 0)
+
+    # 5. VWAP deviation (mean reversion)
+    vwap_dev = (close - f['VWAP']) / f['VWAP'] * 100
+    score += np.select([vwap_dev > 3, vwap_dev < -3], [-2, 2], 0)
+
+    # 6. Squeeze detection
+    score -= np.where(f['Squeeze_On'], 2, 0)
+
+    # 7. MACD confirmation
+    score += np.select([f['MACD'] > f['MACD_Signal'], f['MACD'] < f['MACD_Signal']], [1, -1], 0)
+
+    # 8. Volatility adjustment
+    score = np.where(f['Vol_Percentile'] > 0.7, score * 0.7, score)
+
+    return pd.Series(np.round(score, 1), index=f.index, name='Tech_Score')
+
+
+def rank_universe(model, panels, feature_names, classes=None, n_lags=5, features=None):
+    """
+    Daily universe ranking in one vectorized pass
+
+    Builds the latest feature row for every ticker from the panels, runs a
+    single predict over the stacked matrix and joins the technical scores.
+
+    Args:
+        model: Model from walk_forward_cv(keep_models=True) or any fitted estimator
+        panels: dict of field -> wide DataFrame (features.build_panels)
+        feature_names: Feature columns the model was trained on
+        classes: Label order of the probability columns (classification)
+        n_lags: Lag depth used when the features were built
+        features: Output of latest_panel_features (computed if not given)
+
+    Returns:
+        DataFrame indexed by ticker, best first, with:
+            - Price, ML_Score, Tech_Score, Rank
+            - Prob_<class> columns for classifiers
+    """
+    panels = align_panels(panels)
+    if features is None:
+        features = latest_panel_features(panels, n_lags=n_lags)
+    X = features[feature_names].to_numpy(dtype=np.float32)
+    pred = predict_matrix(model, X, n_classes=None if classes is None else len(classes))
+
+    ranking = pd.DataFrame({'Price': panels['Close'].iloc[-1]}, index=features.index)
+    if np.ndim(pred) == 2:
+        for i, label in enumerate(classes):
+            ranking[f'Prob_{label}'] = pred[:, i]
+        # Expected label: P(Buy) - P(Sell) for the -1/0/1 targets
+        ranking['ML_Score'] = pred @ np.asarray(classes, dtype=float)
+    else:
+        ranking['ML_Score'] = pred
+
+    ranking['Tech_Score'] = calculate_improved_scores(panels, features)
+    ranking = ranking.sort_values(['ML_Score', 'Tech_Score'], ascending=False)
+    ranking['Rank'] = np.arange(1, len(ranking) + 1)
+    return ranking
@@ -0,0 +1,381 @@
+"""
+Streaming Indicators
+
+Out-of-core indicator computation for histories too long to hold in memory
+(years of minute bars). OHLCV chunks are read from disk and pushed through
+the indicators as a generator pipeline:
+
+    chunks = read_chunks('data/raw/SPY_1m.csv', chunksize=250_000)
+    for out in stream_indicators(chunks, default_indicators()):
+        ...  # or write_chunks(stream_indicators(...), 'data/processed/SPY_1m.csv')
+
+Each streaming indicator carries exactly the warm-up state it needs from
+one chunk to the next, so the concatenated output matches the in-memory
+functions in indicators.py:
+- Rolling-window indicators keep the last `lookback` input rows (equal up
+  to float rounding, since pandas' rolling sums restart at the tail)
+- EMA-based indicators (EMA, MACD, Keltner) keep the last smoothed value
+- obv / vwap keep their running totals, SuperTrend its direction
+  (bit-identical)
+
+Peak memory is one chunk plus those small tails.
+"""
+
+import inspect
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+from cache import no_cache
+import indicators as ind
+
+
+# Rows of history each rolling indicator needs to reproduce its first output
+LOOKBACK = {
+    'sma': lambda p: p['window'] - 1,
+    'rsi': lambda p: p['window'],
+    'bollinger_bands': lambda p: p['window'] - 1,
+    'adx': lambda p: 2 * p['window'] - 1,
+    'atr': lambda p: p['window'],
+    'stochastic': lambda p: p['k_window'] + p['d_window'] - 2,
+    'cci': lambda p: p['window'] - 1,
+    'williams_r': lambda p: p['window'] - 1,
+    'roc': lambda p: p['window'],
+    'mfi': lambda p: p['window'],
+    'cmf': lambda p: p['window'] - 1,
+    'donchian_channels': lambda p: p['window'] - 1,
+    'ichimoku_cloud': lambda p: 51 + 26,
+}
+
+# Indicator argument name -> OHLCV column
+INPUTS = {
+    'data': 'Close',
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'volume': 'Volume',
+}
+
+
+def read_chunks(path, chunksize=250_000, **kwargs):
+    """
+    Yield OHLCV chunks from a CSV (or parquet) file without loading it whole
+
+    Args:
+        path: File written by StockDataFetcher / DataFrame.to_csv (Date index
+              in the first column) or a parquet file
+        chunksize: Rows per chunk
+        **kwargs: Passed to pd.read_csv
+    """
+    path = Path(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    kwargs.setdefault('index_col', 0)
+    kwargs.setdefault('parse_dates', True)
+    yield from pd.read_csv(path, chunksize=chunksize, **kwargs)
+
+
+def write_chunks(chunks, path):
+    """
+    Append streamed chunks to a CSV file (header written once)
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0)
+        rows += len(chunk)
+    return rows
+
+
+class _Tail:
+    """Keeps the last n rows of a stream and prepends them to the next chunk"""
+
+    def __init__(self, n):
+        self.n = n
+        self.rows = None
+
+    def extend(self, chunk):
+        """Return (tail + chunk, length of the prepended tail)"""
+        skip = 0 if self.rows is None else len(self.rows)
+        data = chunk if self.rows is None else pd.concat([self.rows, chunk])
+        self.rows = data.iloc[max(len(data) - self.n, 0):] if self.n > 0 else data.iloc[:0]
+        return data, skip
+
+
+class _EWM:
+    """
+    ewm(span, adjust=False) continued across chunks
+
+    Prepending the last smoothed value (plus any NaN inputs seen since) to
+    the next chunk restarts the recursion in exactly the state it stopped.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self.last = None
+        self.gap = 0
+
+    def update(self, values):
+        seed = []
+        if self.last is not None:
+            seed = [self.last] + [np.nan] * self.gap
+        data = pd.concat([pd.Series(seed, dtype=float), values.reset_index(drop=True)],
+                         ignore_index=True) if seed else values.reset_index(drop=True)
+        result = data.ewm(span=self.span, adjust=False).mean().iloc[len(seed):]
+
+        valid = np.flatnonzero(values.notna().to_numpy())
+        if len(valid):
+            self.last = result.iloc[valid[-1]]
+            self.gap = len(values) - 1 - valid[-1]
+        elif self.last is not None:
+            self.gap += len(values)
+        return pd.Series(result.to_numpy(), index=values.index)
+
+
+def _running_sum(values, total):
+    """cumsum continued from a previous total; returns (sums, new total)"""
+    if total is None:
+        sums = values.cumsum()
+    else:
+        seeded = pd.concat([pd.Series([total]), values.reset_index(drop=True)], ignore_index=True)
+        sums = pd.Series(seeded.cumsum().to_numpy()[1:], index=values.index)
+    running = sums.dropna()
+    return sums, (running.iloc[-1] if len(running) else total)
+
+
+class Windowed:
+    """
+    Any finite-lookback indicator from indicators.py, computed chunk by chunk
+
+    Usage:
+        Windowed(ind.rsi, window=14)
+        Windowed(ind.adx, window=14)
+    """
+
+    def __init__(self, func, lookback=None, **params):
+        """
+        Args:
+            func: Indicator function (e.g. indicators.sma)
+            lookback: Rows of history needed (default: from LOOKBACK)
+            **params: Indicator parameters besides the price inputs
+        """
+        self.func = getattr(func, '__wrapped__', func)
+        signature = inspect.signature(self.func)
+        self.inputs = [name for name in signature.parameters if name in INPUTS]
+        self.params = params
+
+        if lookback is None:
+            bound = signature.bind_partial(**params)
+            bound.apply_defaults()
+            lookback = LOOKBACK[self.func.__name__](bound.arguments)
+        self.tail = _Tail(lookback)
+
+    def update(self, chunk):
+        data, skip = self.tail.extend(chunk[[INPUTS[name] for name in self.inputs]])
+        args = [data[INPUTS[name]] for name in self.inputs]
+        return self.func(*args, **self.params).iloc[skip:]
+
+
+class EMA:
+    """Streaming indicators.ema"""
+
+    def __init__(self, window, column='Close'):
+        self.column = column
+        self.ewm = _EWM(window)
+
+    def update(self, chunk):
+        return self.ewm.update(chunk[self.column])
+
+
+class MACD:
+    """Streaming indicators.macd (MACD, Signal, Histogram)"""
+
+    def __init__(self, fast=12, slow=26, signal=9, column='Close'):
+        self.column = column
+        self.fast, self.slow, self.signal = _EWM(fast), _EWM(slow), _EWM(signal)
+
+    def update(self, chunk):
+        close = chunk[self.column]
+        macd_line = self.fast.update(close) - self.slow.update(close)
+        signal_line = self.signal.update(macd_line)
+        return pd.DataFrame({
+            'MACD': macd_line,
+            'Signal': signal_line,
+            'Histogram': macd_line - signal_line
+        })
+
+
+class OBV:
+    """Streaming indicators.obv (carries the last close and running total)"""
+
+    def __init__(self):
+        self.prev_close = None
+        self.total = None
+
+    def update(self, chunk):
+        close = chunk['Close']
+        if self.prev_close is not None:
+            change = pd.concat([pd.Series([self.prev_close], dtype=float),
+                                close.reset_index(drop=True)], ignore_index=True).diff()
+            change = pd.Series(change.to_numpy()[1:], index=close.index)
+        else:
+            change = close.diff()
+        self.prev_close = close.iloc[-1]
+
+        flow = (np.sign(change) * chunk['Volume']).fillna(0)
+        obv, self.total = _running_sum(flow, self.total)
+        return obv
+
+
+class VWAP:
+    """Streaming indicators.vwap (carries the cumulative price*volume and volume)"""
+
+    def __init__(self):
+        self.pv_total = None
+        self.volume_total = None
+
+    def update(self, chunk):
+        typical_price = (chunk['High'] + chunk['Low'] + chunk['Close']) / 3
+        pv, self.pv_total = _running_sum(typical_price * chunk['Volume'], self.pv_total)
+        volume, self.volume_total = _running_sum(chunk['Volume'], self.volume_total)
+        return pv / volume
+
+
+class SuperTrend:
+    """Streaming indicators.supertrend (carries ATR history and the direction)"""
+
+    def __init__(self, atr_period=10, multiplier=3):
+        self.atr_period = atr_period
+        self.multiplier = multiplier
+        self.atr = Windowed(ind.atr, window=atr_period)
+        self.position = 0
+        self.direction = None
+
+    def update(self, chunk):
+        atr_values = self.atr.update(chunk)
+        hl_avg = (chunk['High'] + chunk['Low']) / 2
+        upper_band = (hl_avg + (self.multiplier * atr_values)).to_numpy()
+        lower_band = (hl_avg - (self.multiplier * atr_values)).to_numpy()
+        close = chunk['Close'].to_numpy()
+
+        n = len(chunk)
+        supertrend = np.full(n, np.nan)
+        direction = np.full(n, np.nan)
+        # Bars before the first valid ATR stay NaN, as in the in-memory loop
+        start = max(self.atr_period - self.position, 0)
+        for i in range(start, n):
+            if self.direction is None:
+                self.direction = 1
+            elif self.direction == 1:
+                self.direction = 1 if close[i] > lower_band[i] else -1
+            else:
+                self.direction = -1 if close[i] < upper_band[i] else 1
+            supertrend[i] = lower_band[i] if self.direction == 1 else upper_band[i]
+            direction[i] = self.direction
+        self.position += n
+
+        return pd.DataFrame({
+            'SuperTrend': supertrend,
+            'Direction': direction
+        }, index=chunk.index)
+
+
+class KeltnerChannels:
+    """Streaming indicators.keltner_channels"""
+
+    def __init__(self, window=20, atr_period=10, multiplier=2):
+        self.multiplier = multiplier
+        self.middle = EMA(window)
+        self.atr = Windowed(ind.atr, window=atr_period)
+
+    def update(self, chunk):
+        middle = self.middle.update(chunk)
+        atr_values = self.atr.update(chunk)
+        return pd.DataFrame({
+            'Upper': middle + (self.multiplier * atr_values),
+            'Middle': middle,
+            'Lower': middle - (self.multiplier * atr_values)
+        })
+
+
+class SqueezeMomentum:
+    """Streaming indicators.squeeze_momentum"""
+
+    def __init__(self, bb_length=20, kc_length=20):
+        self.bb = Windowed(ind.bollinger_bands, window=bb_length)
+        self.kc = KeltnerChannels(kc_length)
+        self.sma = Windowed(ind.sma, window=bb_length)
+
+    def update(self, chunk):
+        bb = self.bb.update(chunk)
+        kc = self.kc.update(chunk)
+        return pd.DataFrame({
+            'Squeeze_On': (bb['Lower'] > kc['Lower']) & (bb['Upper'] < kc['Upper']),
+            'Momentum': chunk['Close'] - self.sma.update(chunk)
+        })
+
+
+def default_indicators():
+    """The notebooks' standard indicator set as fresh streaming objects"""
+    return {
+        'SMA_20': Windowed(ind.sma, window=20),
+        'SMA_50': Windowed(ind.sma, window=50),
+        'EMA_20': EMA(20),
+        'RSI_14': Windowed(ind.rsi, window=14),
+        'MACD': MACD(),
+        'BB': Windowed(ind.bollinger_bands),
+        'ATR_14': Windowed(ind.atr, window=14),
+        'ADX': Windowed(ind.adx),
+        'STOCH': Windowed(ind.stochastic),
+        'MFI_14': Windowed(ind.mfi),
+        'CMF_20': Windowed(ind.cmf),
+        'OBV': OBV(),
+        'VWAP': VWAP(),
+        'ST': SuperTrend(),
+        'KC': KeltnerChannels(),
+        'Squeeze': SqueezeMomentum(),
+    }
+
+
+def stream_indicators(chunks, indicators=None, keep_inputs=True):
+    """
+    Push OHLCV chunks through streaming indicators
+
+    Args:
+        chunks: Iterable of OHLCV DataFrames in time order (e.g. read_chunks())
+        indicators: dict of output name -> streaming indicator
+                    (default: default_indicators())
+        keep_inputs: Include the OHLCV columns in the output
+
+    Yields:
+        One DataFrame per input chunk. Series results become a column named
+        after their key, DataFrame results become '<key>_<column>' columns.
+    """
+    if indicators is None:
+        indicators = default_indicators()
+
+    for chunk in chunks:
+        columns = {}
+        # Each chunk is seen once, so there is nothing worth caching
+        with no_cache():
+            for name, indicator in indicators.items():
+                result = indicator.update(chunk)
+                if isinstance(result, pd.DataFrame):
+                    for column, values in result.items():
+                        columns[f'{name}_{column}'] = values
+                else:
+                    columns[name] = result
+
+        out = pd.DataFrame(columns, index=chunk.index)
+        if keep_inputs:
+            out = pd.concat([chunk, out], axis=1)
+        yield out
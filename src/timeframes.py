@@ -0,0 +1,194 @@
+"""
+Multi-Timeframe Bars
+
+Derives weekly, monthly and N-minute OHLCV bars from one base series (e.g.
+daily or 1-minute bars from StockDataFetcher) so a single download serves
+every timeframe the position-trading notebooks look at.
+
+- resample_ohlcv: one vectorized grouping pass (np.*.reduceat over bucket
+  boundaries) per timeframe
+- MultiTimeframeBars: keeps the higher timeframes up to date as base bars
+  arrive, touching only the last (still forming) bar and new ones
+- align / apply: map higher-timeframe indicator values back onto the base
+  index without lookahead
+
+Higher-timeframe bars are indexed by the start of their bucket (Saturday
+for W-FRI weeks, the 1st for months, the floored time for N-minute bars).
+"""
+
+import pandas as pd
+import numpy as np
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+
+TIMEFRAMES = {
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+    'quarterly': 'Q',
+}
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _rule(timeframe):
+    return TIMEFRAMES.get(timeframe, timeframe)
+
+
+def bucket_keys(index, timeframe):
+    """
+    Bucket start for every bar (tz-naive wall time)
+
+    Args:
+        index: DatetimeIndex of the base bars
+        timeframe: 'weekly' | 'monthly' | 'quarterly' or a pandas alias
+                   ('W-FRI', 'M', '15min', '1h', ...)
+    """
+    rule = _rule(timeframe)
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    try:
+        fixed = isinstance(to_offset(rule), Tick)
+    except ValueError:
+        fixed = False
+
+    if fixed:
+        return index.floor(rule)
+    return index.to_period(rule).start_time
+
+
+def _localize(keys, tz):
+    return keys if tz is None else keys.tz_localize(tz)
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Aggregate base OHLCV bars into a higher timeframe in one pass
+
+    Args:
+        df: OHLCV DataFrame with a sorted DatetimeIndex
+        timeframe: see bucket_keys()
+
+    Returns:
+        DataFrame with Open/High/Low/Close/Volume plus Bars (base bars in the
+        bucket) and End (timestamp of the bucket's last base bar)
+    """
+    keys = bucket_keys(df.index, timeframe)
+    if len(keys) == 0:
+        return pd.DataFrame(columns=OHLCV + ['Bars', 'End'])
+
+    values = keys.asi8
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    ends = np.r_[starts[1:], len(values)] - 1
+
+    bars = pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(dtype=float), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(dtype=float), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(dtype=float), starts),
+        'Bars': ends - starts + 1,
+        'End': df.index[ends],
+    }, index=_localize(keys[starts], pd.DatetimeIndex(df.index).tz))
+    return bars
+
+
+def align(values, base_index, timeframe, closed_only=True, is_last=None):
+    """
+    Map higher-timeframe values back onto base bars without lookahead
+
+    Args:
+        values: Series/DataFrame indexed like resample_ohlcv() output
+        base_index: DatetimeIndex of the base bars
+        timeframe: Timeframe the values were computed on
+        closed_only: True = every base bar sees the previous completed
+                     higher bar only. False = the last base bar of a bucket
+                     also sees its own (now complete) higher bar
+        is_last: Boolean array flagging the final base bar of each bucket
+                 (only needed with closed_only=False; default: inferred
+                 from base_index, which treats the newest bar as complete)
+
+    Returns:
+        Values reindexed to base_index
+    """
+    base_keys = bucket_keys(base_index, timeframe)
+    value_keys = pd.DatetimeIndex(values.index)
+    if value_keys.tz is not None:
+        value_keys = value_keys.tz_localize(None)
+
+    pos = value_keys.get_indexer(base_keys)
+    if not closed_only:
+        if is_last is None:
+            k = base_keys.asi8
+            is_last = np.r_[k[1:] != k[:-1], True]
+        use = np.where(is_last, pos, pos - 1)
+    else:
+        use = pos - 1
+    # Bars before the first higher bar (or in unknown buckets) get NaN
+    use = np.where(pos < 0, -1, use)
+
+    valid = pd.Series(use >= 0, index=base_index)
+    taken = values.iloc[np.maximum(use, 0)]
+    taken.index = base_index
+    if isinstance(taken, pd.DataFrame):
+        return taken.where(valid, axis=0)
+    return taken.where(valid)
+
+
+class MultiTimeframeBars:
+    """Base bars plus incrementally maintained higher-timeframe bars"""
+
+    def __init__(self, base, timeframes=('weekly', 'monthly')):
+        """
+        Args:
+            base: OHLCV DataFrame at the base frequency (daily, 1-minute, ...)
+            timeframes: Higher timeframes to maintain
+        """
+        self.base = base.copy()
+        self.timeframes = list(timeframes)
+        self.bars = {tf: resample_ohlcv(self.base, tf) for tf in self.timeframes}
+
+    def update(self, new_bars):
+        """
+        Add base bars and update every higher timeframe
+
+        Only the last (possibly still forming) higher bar is merged with the
+        new data; completed bars are left untouched.
+        """
+        new_bars = new_bars[new_bars.index > self.base.index[-1]]
+        if new_bars.empty:
+            return self
+        self.base = pd.concat([self.base, new_bars[self.base.columns]])
+
+        for tf in self.timeframes:
+            current = self.bars[tf]
+            fresh = resample_ohlcv(new_bars, tf)
+            if len(current) and fresh.index[0] == current.index[-1]:
+                last = current.iloc[-1]
+                first = fresh.iloc[0]
+                fresh.iloc[0, fresh.columns.get_loc('Open')] = last['Open']
+                fresh.iloc[0, fresh.columns.get_loc('High')] = max(last['High'], first['High'])
+                fresh.iloc[0, fresh.columns.get_loc('Low')] = min(last['Low'], first['Low'])
+                fresh.iloc[0, fresh.columns.get_loc('Volume')] = last['Volume'] + first['Volume']
+                fresh.iloc[0, fresh.columns.get_loc('Bars')] = last['Bars'] + first['Bars']
+                current = current.iloc[:-1]
+            self.bars[tf] = pd.concat([current, fresh])
+        return self
+
+    def apply(self, timeframe, func, *args, closed_only=True, **kwargs):
+        """
+        Run an indicator on a higher timeframe and align it to the base bars
+
+        Usage:
+            mtf.apply('weekly', lambda bars: sma(bars['Close'], 10))
+            mtf.apply('weekly', lambda bars: adx(bars['High'], bars['Low'], bars['Close']))
+
+        Args:
+            timeframe: One of self.timeframes
+            func: Callable taking the higher-timeframe OHLCV DataFrame
+            closed_only: See align()
+        """
+        values = func(self.bars[timeframe], *args, **kwargs)
+        return align(values, self.base.index, timeframe, closed_only=closed_only)
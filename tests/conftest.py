@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def memory_cache():
+    """Fresh memory-only cache per test, so nothing is written to data/cache"""
+    previous = cache.get_default_cache()
+    store = cache.IndicatorCache(cache_dir=None)
+    cache.set_default_cache(store)
+    yield store
+    cache.set_default_cache(previous)
+
+
+def make_ohlcv(n=400, seed=0, start='2020-01-01'):
+    """Random-walk daily OHLCV bars"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    spread = rng.random(n) * 0.02
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, n)),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, n).astype(float),
+    }, index=pd.bdate_range(start, periods=n, name='Date'))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import resolve_exits
+from conftest import make_ohlcv
+
+
+def reference_exits(close, entries, stop, target, trailing_pct, ma, rsi, rsi_floor,
+                    regime_ok, max_hold_bars, max_hold_days, dates):
+    """Bar-by-bar loop in the notebooks' style: first rule to fire, checked in priority order"""
+    rows = []
+    for i, entry in enumerate(entries):
+        peak = close[entry]
+        exit_idx, price, reason = len(close) - 1, None, 'OPEN'
+        for t in range(entry + 1, len(close)):
+            peak = max(peak, close[t])
+            rules = [
+                ('STOP_LOSS', stop is not None and close[t] <= stop[i], lambda: stop[i]),
+                ('TRAILING_STOP', trailing_pct is not None and close[t] <= peak * (1 - trailing_pct),
+                 lambda: peak * (1 - trailing_pct)),
+                ('TARGET', target is not None and close[t] >= target[i], lambda: target[i]),
+                ('TREND_BREAKDOWN', ma is not None and close[t] < ma[t] and rsi[t] < rsi_floor,
+                 lambda: close[t]),
+                ('MARKET_REGIME', regime_ok is not None and not regime_ok[t], lambda: close[t]),
+                ('TIME_EXIT', (max_hold_bars is not None and t - entry >= max_hold_bars)
+                 or (max_hold_days is not None
+                     and (dates[t] - dates[entry]).days >= max_hold_days), lambda: close[t]),
+            ]
+            fired = [(name, level) for name, hit, level in rules if hit]
+            if fired:
+                reason, level = fired[0]
+                exit_idx, price = t, level()
+                break
+        highest = close[entry:exit_idx + 1].max()
+        price = close[exit_idx] if price is None else price
+        rows.append({
+            'entry_idx': entry,
+            'exit_idx': exit_idx,
+            'entry_price': close[entry],
+            'exit_price': price,
+            'highest_price': highest,
+            'exit_reason': reason,
+            'bars_held': exit_idx - entry,
+            'pnl_pct': (price / close[entry] - 1) * 100,
+            'max_gain_pct': (highest / close[entry] - 1) * 100,
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('hold', [{'max_hold_bars': 40}, {'max_hold_days': 60}, {}])
+def test_resolve_exits_matches_bar_by_bar_loop(hold):
+    bars = make_ohlcv(1500, seed=4)
+    close = bars['Close'].to_numpy()
+    rng = np.random.default_rng(5)
+    entries = np.sort(rng.choice(len(close), 600, replace=False))
+    stop = close[entries] * rng.uniform(0.85, 0.97, len(entries))
+    target = close[entries] * rng.uniform(1.03, 1.25, len(entries))
+    ma = bars['Close'].rolling(20).mean().to_numpy()
+    rsi = rng.uniform(20, 80, len(close))
+    regime_ok = rng.random(len(close)) > 0.01
+    rules = dict(stop=stop, target=target, trailing_pct=0.08, ma=ma, rsi=rsi, rsi_floor=30,
+                 regime_ok=regime_ok, **hold)
+
+    result = resolve_exits(bars['Close'], entries, chunk_size=128, **rules)
+    expected = reference_exits(close, entries, rules['stop'], rules['target'], 0.08, ma, rsi, 30,
+                               regime_ok, hold.get('max_hold_bars'), hold.get('max_hold_days'),
+                               bars.index)
+
+    assert set(result['exit_reason']) - {'OPEN'}  # Several rules actually fire
+    pd.testing.assert_frame_equal(result.astype(expected.dtypes), expected, check_exact=False)
+
+
+def test_resolve_exits_without_rules_runs_to_the_last_bar():
+    close = pd.Series([10.0, 11, 9, 12, 8])
+    result = resolve_exits(close, [0, 2])
+    assert list(result['exit_reason']) == ['OPEN', 'OPEN']
+    assert list(result['exit_idx']) == [4, 4]
+    assert list(result['highest_price']) == [12, 12]
+
+
+def test_same_bar_ties_follow_rule_priority():
+    close = pd.Series([100.0, 104, 90, 95])
+    regime_ok = np.array([True, True, False, False])
+    result = resolve_exits(close, [0], stop=[92.0], trailing_pct=0.05, regime_ok=regime_ok,
+                           max_hold_bars=2)
+    # Stop, trailing stop, regime and time all fire on bar 2; the stop wins and fills at its level
+    assert result.loc[0, 'exit_reason'] == 'STOP_LOSS'
+    assert result.loc[0, 'exit_price'] == 92.0
+    assert result.loc[0, 'highest_price'] == 104.0
@@ -0,0 +1,56 @@
+import numpy as np
+
+from cache import IndicatorCache
+
+
+def disk_bytes(directory):
+    return sum(path.stat().st_size for path in directory.glob('*.pkl'))
+
+
+def test_disk_size_tracked_without_rescanning(tmp_path, monkeypatch):
+    store = IndicatorCache(cache_dir=tmp_path, max_disk_bytes=10 * 1024**2)
+    scans = []
+    evict = store._evict
+    monkeypatch.setattr(store, '_evict', lambda: (scans.append(1), evict()))
+
+    for i in range(50):
+        store.set(f'key{i}', np.arange(100) + i)
+    store.set('key0', np.arange(1000))  # Overwrite counts the size difference
+
+    assert len(scans) == 1
+    assert store._disk_bytes == disk_bytes(tmp_path)
+
+
+def test_disk_tier_evicts_oldest_over_limit(tmp_path):
+    store = IndicatorCache(cache_dir=tmp_path, max_disk_bytes=20_000)
+    for i in range(50):
+        store.set(f'key{i}', np.arange(1000) + i)
+
+    assert disk_bytes(tmp_path) <= 20_000
+    assert (tmp_path / 'key49.pkl').exists()
+    assert not (tmp_path / 'key0.pkl').exists()
+    assert store._disk_bytes == disk_bytes(tmp_path)
+
+
+def test_memoize_key_changes_with_code_version(monkeypatch):
+    import cache
+
+    calls = []
+
+    @cache.memoize
+    def double(x):
+        calls.append(x)
+        return 2 * x
+
+    assert double(3) == 6 and double(3) == 6
+    assert len(calls) == 1
+
+    monkeypatch.setattr(cache, 'CACHE_VERSION', cache.CACHE_VERSION + 1)
+
+    @cache.memoize
+    def double(x):  # Same name, new code version
+        calls.append(x)
+        return 2 * x
+
+    assert double(3) == 6
+    assert len(calls) == 2
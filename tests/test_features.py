@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_ohlcv
+from features import FeatureEngineer, build_panels, latest_panel_features
+
+
+def build(bars):
+    return FeatureEngineer(bars).build_all_features()
+
+
+def test_append_matches_full_rebuild():
+    bars = make_ohlcv(400)
+    engineer = build(bars.iloc[:300]).append(bars.iloc[300:])
+
+    pd.testing.assert_frame_equal(engineer.df, build(bars).df, check_freq=False)
+
+
+def test_append_after_cache_hit_matches_full_rebuild(memory_cache):
+    bars = make_ohlcv(400)
+    build(bars.iloc[:300])
+    hits = memory_cache.hits
+    cached = build(bars.iloc[:300])
+    assert memory_cache.hits > hits
+
+    cached.append(bars.iloc[300:])
+
+    pd.testing.assert_frame_equal(cached.df, build(bars).df, check_freq=False)
+
+
+def test_latest_panel_features_match_feature_engineer():
+    frames = {
+        'FULL': make_ohlcv(300, seed=1),
+        'GAP': make_ohlcv(300, seed=2).drop(pd.bdate_range('2020-01-01', periods=300)[[120, 250]]),
+        'STALE': make_ohlcv(300, seed=3).iloc[:-2],
+    }
+    latest = latest_panel_features(build_panels(frames))
+
+    for ticker, bars in frames.items():
+        engineer = FeatureEngineer(bars)
+        engineer.add_technical_indicators().add_price_features().add_volume_features()
+        engineer.add_lagged_features().add_trend_features()
+        expected = engineer.df.iloc[-1][latest.columns].astype(float).rename(ticker)
+        pd.testing.assert_series_equal(latest.loc[ticker].astype(float), expected, rtol=1e-9)
+
+
+def test_repeated_appends_write_in_place_and_match_rebuild():
+    bars = make_ohlcv(400)
+    engineer = build(bars.iloc[:300])
+    engineer.create_targets(horizons=(1, 5), barriers=[(0.05, 0.03)])
+
+    engineer.append(bars.iloc[300:301])
+    close = engineer.df['Close'].to_numpy()
+    for end in range(302, 401, 7):
+        engineer.append(bars.iloc[:end])
+    # Within capacity, later appends reuse the same buffers
+    assert np.shares_memory(engineer.df['Close'].to_numpy(), close)
+
+    expected = build(bars)
+    expected.create_targets(horizons=(1, 5), barriers=[(0.05, 0.03)])
+    pd.testing.assert_frame_equal(engineer.df, expected.df, check_freq=False)
+
+
+def test_append_after_replacing_df_reallocates():
+    bars = make_ohlcv(400)
+    engineer = build(bars.iloc[:300]).append(bars.iloc[300:350])
+    engineer.df = engineer.df.assign(Extra=1.0)
+
+    engineer.append(bars.iloc[350:])
+
+    expected = build(bars).df.assign(Extra=1.0)
+    expected.loc[expected.index[350:], 'Extra'] = np.nan
+    pd.testing.assert_frame_equal(engineer.df, expected, check_freq=False)
+
+
+def test_append_does_not_fill_the_cache(memory_cache):
+    bars = make_ohlcv(400)
+    engineer = build(bars.iloc[:300])
+    entries = len(memory_cache.memory)
+
+    engineer.append(bars.iloc[300:301])
+
+    assert len(memory_cache.memory) == entries
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from levels import support_resistance_zones
+
+
+def test_zones_never_span_more_than_tolerance():
+    # Swing highs every 20 bars, each 1% above the last: neighbouring gaps
+    # stay under the tolerance while the whole run spans ~20%
+    n = 400
+    bars = np.arange(n)
+    close = pd.Series(100 * 1.01 ** (bars // 20) * (1 + 0.05 * np.sin(bars * np.pi / 10)),
+                      index=pd.bdate_range('2020-01-01', periods=n))
+    zones = support_resistance_zones(close * 1.001, close * 0.999, close,
+                                     tolerance=0.02, min_touches=1)
+
+    assert len(zones) > 2
+    assert (zones['Zone_High'] / zones['Zone_Low'] - 1 <= 0.02 + 1e-12).all()
+
+
+def test_zones_per_ticker_match_single_series():
+    n = 300
+    rng = np.random.default_rng(0)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, 3)), axis=0)),
+                         index=pd.bdate_range('2020-01-01', periods=n), columns=list('ABC'))
+    high, low = close * 1.01, close * 0.99
+    wide = support_resistance_zones(high, low, close)
+
+    for ticker in close:
+        single = support_resistance_zones(high[ticker], low[ticker], close[ticker])
+        pd.testing.assert_frame_equal(
+            wide[wide['Ticker'] == ticker].drop(columns='Ticker').reset_index(drop=True), single)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_ohlcv
+from features import FeatureEngineer
+from models import PurgedWalkForward, predict_matrix, prepare_training_data, walk_forward_cv
+
+
+def labelled(seed):
+    engineer = FeatureEngineer(make_ohlcv(300, seed=seed)).build_all_features()
+    engineer.create_targets(horizons=(1, 20), barriers=[(0.1, 0.05)])
+    return engineer.df
+
+
+def test_prepare_training_data_drops_unresolved_rows_of_any_horizon():
+    frames = {'AAA': labelled(0), 'BBB': labelled(1)}
+
+    for target, horizon in [('Target', 1), ('Target_20d_0.02', 20), ('TB_20d_0.1_0.05', 20)]:
+        data = prepare_training_data(frames, target_col=target)
+        assert data['horizon'] == horizon
+        last_labelled = frames['AAA'].index[-horizon - 1]
+        for ticker in frames:
+            assert data['times'][data['tickers'] == ticker].max() == np.datetime64(last_labelled)
+
+
+def test_predict_matrix_uses_xgboost_best_iteration():
+    xgb = pytest.importorskip('xgboost')
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 5)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(size=600) > 0).astype(float)
+    train, valid = xgb.DMatrix(X[:400], label=y[:400]), xgb.DMatrix(X[400:], label=y[400:])
+    booster = xgb.train({'objective': 'binary:logistic', 'eta': 0.3}, train,
+                        num_boost_round=300, evals=[(valid, 'valid')],
+                        early_stopping_rounds=5, verbose_eval=False)
+    assert booster.best_iteration + 1 < booster.num_boosted_rounds()
+
+    expected = booster.predict(xgb.DMatrix(X), iteration_range=(0, booster.best_iteration + 1))
+    np.testing.assert_allclose(predict_matrix(booster, X), expected)
+
+
+@pytest.mark.parametrize('model_type', ['lightgbm', 'random_forest'])
+def test_walk_forward_cv_independent_of_n_jobs(model_type, capsys):
+    pytest.importorskip('lightgbm' if model_type == 'lightgbm' else 'sklearn')
+    data = prepare_training_data({'AAA': labelled(0), 'BBB': labelled(1)})
+    params = {'n_estimators': 20} if model_type == 'random_forest' else {}
+
+    runs = []
+    for n_jobs in (1, 4):
+        runs.append(walk_forward_cv(data, model_type, n_splits=4, params=params, n_chains=2,
+                                    num_boost_round=50, n_jobs=n_jobs))
+        layout = next(line for line in capsys.readouterr().out.splitlines()
+                      if line.startswith('Walk-forward CV'))
+        # Forests get one chain per fold; the pool runs with n_jobs=4
+        chains = 4 if model_type == 'random_forest' else 2
+        assert f'{chains} chain(s)' in layout
+        assert f'{min(n_jobs, chains)} worker(s)' in layout
+
+    pd.testing.assert_frame_equal(runs[0]['folds'], runs[1]['folds'])
+    np.testing.assert_array_equal(runs[0]['oof'], runs[1]['oof'])
+
+
+@pytest.mark.parametrize('model_type', ['lightgbm', 'xgboost'])
+def test_warm_start_continues_from_best_iteration(model_type):
+    pytest.importorskip(model_type)
+    data = prepare_training_data({'AAA': labelled(0), 'BBB': labelled(1)})
+
+    params = ({'learning_rate': 0.3, 'min_data_in_leaf': 5} if model_type == 'lightgbm'
+              else {'eta': 0.3})
+    result = walk_forward_cv(data, model_type, n_splits=4, n_chains=1, num_boost_round=200,
+                             early_stopping_rounds=5, params=params, keep_models=True)
+
+    # Each fold's model holds exactly its best trees, which the next fold starts from
+    for model, best in zip(result['models'], result['folds']['best_iteration']):
+        trees = (model.current_iteration() if model_type == 'lightgbm'
+                 else model.num_boosted_rounds())
+        assert trees == best
+    assert (result['folds']['best_iteration'].diff().dropna() >= 0).all()
+
+
+def test_walk_forward_cv_purges_the_label_horizon():
+    frames = {'AAA': labelled(0), 'BBB': labelled(1)}
+    data = prepare_training_data(frames, target_col='Target_20d_0.02')
+
+    with pytest.raises(ValueError, match='horizon'):
+        walk_forward_cv(data, 'random_forest', n_splits=2, horizon=1)
+
+    folds = PurgedWalkForward(n_splits=2, horizon=20).split_with_validation(data['times'])
+    result = walk_forward_cv(data, 'random_forest', n_splits=2, params={'n_estimators': 10})
+    for (fit_rows, val_rows, _), (_, row) in zip(folds, result['folds'].iterrows()):
+        assert row['train_size'] == len(fit_rows) + len(val_rows)
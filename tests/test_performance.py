@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from performance import performance_metrics, rolling_metrics, trade_metrics
+
+
+def curves(n=300, m=3, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, m)), axis=0))
+    equity = pd.DataFrame(values, index=pd.bdate_range('2020-01-01', periods=n),
+                          columns=[f'S{i}' for i in range(m)])
+    equity.iloc[:40, 1] = np.nan  # A curve that starts late
+    return equity
+
+
+def test_rolling_drawdown_matches_full_metrics_on_each_window():
+    equity, window = curves(), 30
+    rolling = rolling_metrics(equity, window)
+
+    for t in (window, 45, 120, len(equity) - 1):
+        expected = performance_metrics(equity.iloc[t - window:t + 1].dropna(axis=1, how='all'))
+        for name in ('Max_Drawdown', 'Max_DD_Duration'):
+            got = rolling[name].iloc[t][expected.index]
+            np.testing.assert_allclose(got.to_numpy(dtype=float),
+                                       expected[name].to_numpy(dtype=float))
+    assert rolling['Max_Drawdown'].iloc[:window].isna().all().all()
+
+
+def test_rolling_trade_metrics_use_trades_closed_in_window():
+    equity, window = curves(), 30
+    rng = np.random.default_rng(1)
+    trades = {name: [{'Exit_Date': date, 'PnL_Pct': rng.normal(0.5, 3)}
+                     for date in equity.index[rng.choice(len(equity), 60, replace=False)]]
+              for name in equity.columns}
+    rolling = rolling_metrics(equity, window, trades=trades)
+
+    date = equity.index[200]
+    for name in equity.columns:
+        closed = [t['PnL_Pct'] for t in trades[name]
+                  if equity.index[200 - window] < t['Exit_Date'] <= date]
+        expected = trade_metrics(pd.Series(closed)).iloc[0]
+        assert np.isclose(rolling['Win_Rate'].loc[date, name], expected['Win_Rate'])
+        assert np.isclose(rolling['Expectancy'].loc[date, name], expected['Expectancy'])
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_ohlcv
+from features import FeatureEngineer, feature_columns
+from screening import information_coefficient, period_ic, screen_features
+
+# Spearman ranks over the whole column, not pairwise (see the module docstring)
+SPEARMAN_TOLERANCE = 5e-3
+
+
+def engineered(seed, n=600):
+    df = FeatureEngineer(make_ohlcv(n, seed=seed)).build_all_features().df
+    X = df[feature_columns(df.columns)]
+    # Constant columns (Close_Position on symmetric bars) only correlate rounding noise
+    return df, X.loc[:, X.std() > 1e-8 * X.abs().max()]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('target', ['Future_Returns', 'Target'])
+def test_pearson_ic_matches_corrwith(seed, target):
+    df, X = engineered(seed)
+    ic = information_coefficient(X, df[target])
+    pd.testing.assert_series_equal(ic, X.corrwith(df[target]), check_names=False,
+                                   rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('target', ['Future_Returns', 'Target'])
+def test_spearman_ic_matches_corrwith_within_tolerance(seed, target):
+    df, X = engineered(seed)
+    ic = information_coefficient(X, df[target], method='spearman')
+    expected = X.corrwith(df[target], method='spearman')
+    assert (ic - expected).abs().max() < SPEARMAN_TOLERANCE
+
+
+def test_spearman_ic_is_exact_without_nans():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.integers(0, 5, (300, 4)).astype(float), columns=list('abcd'))
+    y = pd.Series(X['a'] + rng.normal(0, 2, 300))
+    ic = information_coefficient(X, y, method='spearman')
+    pd.testing.assert_series_equal(ic, X.corrwith(y, method='spearman'), check_names=False,
+                                   rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('method, missing', [('pearson', 0.05), ('spearman', 0.0)])
+def test_period_ic_matches_groupby_corrwith(method, missing):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(400, 3)), columns=['a', 'b', 'c'])
+    X = X.mask(rng.random((400, 3)) < missing)
+    y = pd.Series(X['a'].fillna(0) + rng.normal(size=400))
+    periods = np.repeat(np.arange(20), 20)
+    rng.shuffle(periods)
+
+    ic = period_ic(X, y, periods, method=method)
+    expected = X.groupby(periods).apply(lambda g: g.corrwith(y[g.index], method=method))
+    np.testing.assert_allclose(ic.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-10)
+
+
+def test_screen_features_pooled_ic_matches_information_coefficient():
+    frames = {f'T{seed}': engineered(seed, 300)[0] for seed in range(3)}
+    table = screen_features(frames, targets=['Future_Returns'], method='pearson')
+    pooled = pd.concat(frames)
+    features = table.loc['Future_Returns'].index
+    expected = information_coefficient(pooled[features], pooled['Future_Returns'])
+    pd.testing.assert_series_equal(table.loc['Future_Returns', 'IC'], expected,
+                                   check_names=False, rtol=0, atol=1e-12)
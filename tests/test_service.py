@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import make_ohlcv
+from providers import LocalProvider
+from service import ScanService
+
+TICKERS = ['AAA', 'BBB', 'CCC']
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for seed, ticker in enumerate(TICKERS + ['SPY', 'QQQ', '^VIX']):
+        make_ohlcv(300, seed=seed).to_csv(tmp_path / f'{ticker}.csv')
+    return tmp_path
+
+
+async def request(port, method, target):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'{method} {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, body = response.split(b'\r\n\r\n', 1)
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_http_api(data_dir):
+    async def scenario():
+        service = ScanService(TICKERS + ['NONE'], LocalProvider(data_dir))
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, body = await request(port, 'GET', '/status')
+            assert status == 200 and body['ready']
+            assert body['tickers'] == 3 and body['missing'] == ['NONE']
+            assert body['market']['regime'] in ('bull', 'neutral', 'correction', 'bear')
+
+            status, body = await request(port, 'GET', '/top?n=2')
+            assert status == 200 and len(body['setups']) == 2
+            ranks = [row['Rank'] for row in body['setups'].values()]
+            assert ranks == [1, 2]
+
+            status, body = await request(port, 'GET', '/score?tickers=aaa,XYZ')
+            assert status == 200
+            assert list(body['scores']) == ['AAA'] and body['missing'] == ['XYZ']
+
+            status, body = await request(port, 'POST', '/refresh')
+            assert status == 200 and body['recomputed'] == 0
+
+            status, _ = await request(port, 'GET', '/nowhere')
+            assert status == 404
+        finally:
+            await service.stop()
+
+    asyncio.run(scenario())
+
+
+def test_refresh_is_incremental(data_dir):
+    provider = LocalProvider(data_dir)
+    calls = []
+    history = provider.history
+    provider.history = lambda *args, **kwargs: (calls.append(kwargs.get('start'))
+                                                or history(*args, **kwargs))
+
+    bars = make_ohlcv(301, seed=10)
+    bars.iloc[:-1].to_csv(data_dir / 'AAA.csv')
+    service = ScanService(TICKERS, provider)
+    asyncio.run(service.refresh())
+    assert service.snapshot['recomputed'] == 3
+
+    # One new bar for AAA only
+    bars.to_csv(data_dir / 'AAA.csv')
+    calls.clear()
+    status = asyncio.run(service.refresh())
+
+    assert status['recomputed'] == 1
+    assert status['last_bar'] == str(bars.index[-1])
+    assert all(start is not None for start in calls)  # Only bars since the last refresh
+
+    fresh = ScanService(TICKERS, LocalProvider(data_dir))
+    asyncio.run(fresh.refresh())
+    pd.testing.assert_frame_equal(service.snapshot['setups'], fresh.snapshot['setups'])
+
+
+class MeanModel:
+    """Regressor stand-in: the mean of each feature row"""
+
+    def predict(self, X):
+        return X.mean(axis=1)
+
+
+def test_model_requires_feature_names(data_dir):
+    with pytest.raises(ValueError, match='feature_names'):
+        ScanService(TICKERS, LocalProvider(data_dir), model=MeanModel())
+
+
+def test_model_scoring_builds_features_once(data_dir, monkeypatch):
+    import features
+    import service as service_module
+    import signals
+
+    calls = []
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return features.latest_panel_features(*args, **kwargs)
+
+    monkeypatch.setattr(service_module, 'latest_panel_features', counted)
+    monkeypatch.setattr(signals, 'latest_panel_features', counted)
+
+    service = ScanService(TICKERS, LocalProvider(data_dir), model=MeanModel(),
+                          feature_names=['RSI_14', 'ADX', 'BB_Position'])
+    asyncio.run(service.refresh())
+
+    setups = service.snapshot['setups']
+    assert len(calls) == 1
+    assert setups['ML_Score'].notna().all() and list(setups['Rank']) == [1, 2, 3]
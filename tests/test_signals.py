@@ -0,0 +1,17 @@
+import pandas as pd
+
+from conftest import make_ohlcv
+from features import build_panels
+from signals import calculate_improved_scores
+
+
+def test_scores_use_each_tickers_own_bars():
+    frames = {ticker: make_ohlcv(300, seed=seed) for seed, ticker in enumerate('ABCD')}
+    frames['C'] = frames['C'].drop(frames['C'].index[[100, 200]])
+    frames['D'] = frames['D'].iloc[:-3]
+
+    scores = calculate_improved_scores(build_panels(frames))
+
+    for ticker, bars in frames.items():
+        alone = calculate_improved_scores(build_panels({ticker: bars}))
+        pd.testing.assert_series_equal(scores[[ticker]], alone)
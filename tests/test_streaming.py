@@ -0,0 +1,59 @@
+import pandas as pd
+
+import indicators as ind
+from conftest import make_ohlcv
+from streaming import default_indicators, read_chunks, stream_indicators, write_chunks
+
+
+def in_memory(bars):
+    """default_indicators() computed by indicators.py on the whole history"""
+    h, l, c, v = bars['High'], bars['Low'], bars['Close'], bars['Volume']
+    results = {
+        'SMA_20': ind.sma(c, 20),
+        'SMA_50': ind.sma(c, 50),
+        'EMA_20': ind.ema(c, 20),
+        'RSI_14': ind.rsi(c, 14),
+        'MACD': ind.macd(c),
+        'BB': ind.bollinger_bands(c),
+        'ATR_14': ind.atr(h, l, c, 14),
+        'ADX': ind.adx(h, l, c),
+        'STOCH': ind.stochastic(h, l, c),
+        'MFI_14': ind.mfi(h, l, c, v),
+        'CMF_20': ind.cmf(h, l, c, v),
+        'OBV': ind.obv(c, v),
+        'VWAP': ind.vwap(h, l, c, v),
+        'ST': ind.supertrend(h, l, c),
+        'KC': ind.keltner_channels(h, l, c),
+        'Squeeze': ind.squeeze_momentum(h, l, c),
+    }
+    columns = {}
+    for name, result in results.items():
+        if isinstance(result, pd.DataFrame):
+            for column, values in result.items():
+                columns[f'{name}_{column}'] = values
+        else:
+            columns[name] = result
+    return pd.concat([bars, pd.DataFrame(columns, index=bars.index)], axis=1)
+
+
+def test_chunked_output_matches_in_memory_indicators(tmp_path):
+    bars = make_ohlcv(2000)
+    source, target = tmp_path / 'bars.csv', tmp_path / 'features.csv'
+    bars.to_csv(source)
+
+    rows = write_chunks(stream_indicators(read_chunks(source, chunksize=257)), target)
+
+    streamed = pd.read_csv(target, index_col=0, parse_dates=True)
+    expected = in_memory(pd.read_csv(source, index_col=0, parse_dates=True))
+    assert rows == len(bars)
+    pd.testing.assert_frame_equal(streamed, expected.astype(streamed.dtypes),
+                                  check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
+
+
+def test_single_chunk_equals_many_chunks():
+    bars = make_ohlcv(1000, seed=3)
+    whole = next(stream_indicators([bars]))
+    chunked = pd.concat(stream_indicators(bars.iloc[i:i + 97] for i in range(0, len(bars), 97)))
+
+    pd.testing.assert_frame_equal(chunked, whole, check_exact=False, rtol=1e-9, atol=1e-9,
+                                  check_freq=False)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_ohlcv
+from indicators import sma
+from timeframes import MultiTimeframeBars, align, resample_ohlcv
+
+# resample rule and the offset from its label to our bucket-start index
+RESAMPLE = {
+    'weekly': ('W-FRI', pd.Timedelta(days=-6)),
+    'monthly': ('MS', pd.Timedelta(0)),
+    '15min': ('15min', pd.Timedelta(0)),
+}
+
+
+def intraday_bars(n=2000, seed=0):
+    bars = make_ohlcv(n, seed=seed)
+    bars.index = pd.date_range('2024-03-04 09:30', periods=n, freq='1min', name='Date')
+    return bars.drop(bars.index[np.random.default_rng(seed).random(n) < 0.1])
+
+
+def expected_bars(df, timeframe):
+    rule, shift = RESAMPLE[timeframe]
+    grouped = df.resample(rule)
+    bars = grouped.agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                        'Volume': 'sum'})
+    bars['Bars'] = grouped['Close'].count()
+    bars['End'] = df.index.to_series().resample(rule).max()
+    bars = bars[bars['Bars'] > 0]
+    bars.index = bars.index + shift
+    return bars
+
+
+@pytest.mark.parametrize('timeframe, bars', [
+    ('weekly', make_ohlcv(500)),
+    ('monthly', make_ohlcv(500)),
+    ('15min', intraday_bars()),
+])
+def test_resample_ohlcv_matches_dataframe_resample(timeframe, bars):
+    result = resample_ohlcv(bars, timeframe)
+    pd.testing.assert_frame_equal(result, expected_bars(bars, timeframe), check_freq=False,
+                                  check_names=False, check_dtype=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('chunk', [1, 3, 17])
+def test_update_matches_resample_of_all_bars(chunk):
+    bars = make_ohlcv(400)
+    mtf = MultiTimeframeBars(bars.iloc[:200])
+    for start in range(200, len(bars), chunk):
+        mtf.update(bars.iloc[start:start + chunk])
+
+    for timeframe in mtf.timeframes:
+        pd.testing.assert_frame_equal(mtf.bars[timeframe], resample_ohlcv(bars, timeframe),
+                                      check_freq=False)
+        pd.testing.assert_frame_equal(mtf.bars[timeframe], expected_bars(bars, timeframe),
+                                      check_freq=False, check_names=False, check_dtype=False,
+                                      check_index_type=False)
+
+
+def test_closed_only_align_has_no_lookahead():
+    bars = make_ohlcv(300)
+    weekly = sma(resample_ohlcv(bars, 'weekly')['Close'], 4)
+    aligned = align(weekly, bars.index, 'weekly', closed_only=True)
+
+    # Each bar may only see the weekly value built from bars it already knew
+    for i in range(40, len(bars), 7):
+        known = sma(resample_ohlcv(bars.iloc[:i + 1], 'weekly')['Close'], 4)
+        completed = known[known.index < known.index[-1]]
+        expected = completed.iloc[-1] if len(completed) else np.nan
+        assert aligned.iloc[i] == pytest.approx(expected, nan_ok=True)
+
+    # Truncating the future leaves past aligned values unchanged
+    past = align(sma(resample_ohlcv(bars.iloc[:150], 'weekly')['Close'], 4),
+                 bars.index[:150], 'weekly', closed_only=True)
+    pd.testing.assert_series_equal(past, aligned.iloc[:150])